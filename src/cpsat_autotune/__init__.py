@@ -1,3 +1,5 @@
+import logging
+
 from .model_loading import import_model, export_model
 from .tune import (
     tune_for_quality_within_timelimit,
@@ -12,3 +14,7 @@ __all__ = [
     "tune_for_gap_within_timelimit",
     "export_model",
 ]
+
+# The library only emits log records. Configuring handlers is left to the application,
+# e.g., the CLI.
+logging.getLogger(__name__).addHandler(logging.NullHandler())
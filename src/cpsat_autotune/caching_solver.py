@@ -1,20 +1,51 @@
 import logging
-from dataclasses import dataclass
-import numpy as np
+import statistics
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import closing
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterator
 from ortools.sat.python import cp_model
 
-from cpsat_autotune.cpsat_parameters import get_parameter_by_name
+from cpsat_autotune.cpsat_parameters import CPSAT_PARAMETERS
+from .disk_cache import DiskCache, compute_namespace
 from .metrics import Comparison, Metric
 from ortools.sat import sat_parameters_pb2
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,  # Set the log level
-    format="%(asctime)s - %(levelname)s - %(message)s",  # Log format
-    handlers=[
-        logging.StreamHandler()  # You can add more handlers (e.g., file handlers) as needed
-    ],
-)
+logger = logging.getLogger(__name__)
+
+
+def _create_setter(
+    name: str,
+) -> Callable[[sat_parameters_pb2.SatParameters, Any], None]:
+    """
+    Returns a function that sets the parameter on a parameter message. Whether the field
+    is repeated is looked up from the protobuf descriptor.
+    """
+    field = sat_parameters_pb2.SatParameters.DESCRIPTOR.fields_by_name[name]
+    if field.label == field.LABEL_REPEATED:
+        return lambda level, value: getattr(level, name).extend(value)
+    return lambda level, value: setattr(level, name, value)
+
+
+# For every parameter, whether it has to be set on the subsolver instead of the top
+# level, and its setter. Built once, such that applying a parameter is a single lookup.
+_SETTERS: dict[
+    str, tuple[bool, Callable[[sat_parameters_pb2.SatParameters, Any], None]]
+] = {
+    param.name: (param.subsolver, _create_setter(param.name))
+    for param in CPSAT_PARAMETERS
+}
+
+
+def _to_hashable(value: Any) -> Any:
+    """
+    Turns the list parameters into sorted tuples, such that they can be part of a key.
+    """
+    if isinstance(value, (list, tuple)):
+        return tuple(sorted(value))
+    return value
 
 
 @dataclass
@@ -25,21 +56,39 @@ class MultiResult:
 
     scores: list[float]
     params: dict[str, float | int | bool | list | tuple]
+    # The number of scores and their sum when the mean was last computed. The scores are
+    # only ever appended, so the mean can be updated incrementally. The means of all results
+    # are compared in every trial to find the incumbent, which would otherwise rescan all
+    # scores. Both values are stored as a single tuple, such that threads computing the
+    # mean concurrently cannot see an inconsistent pair.
+    _partial_sum: tuple[int, float] = field(
+        default=(0, 0.0), init=False, repr=False, compare=False
+    )
 
     def mean(self) -> float:
-        return sum(self.scores) / len(self.scores)
+        count, total = self._partial_sum
+        n = len(self.scores)
+        if count != n:
+            total += sum(self.scores[count:n])
+            self._partial_sum = (n, total)
+        return total / n
 
+    # The number of samples is small, such that the builtins are faster than
+    # converting the list to a NumPy array on every call.
     def median(self) -> float:
-        return float(np.median(self.scores))
+        if len(self.scores) == 1:
+            # Common for trials that have been knocked out or use a single sample.
+            return float(self.scores[0])
+        return float(statistics.median(self.scores))
 
     def std(self) -> float:
-        return float(np.std(self.scores))
+        return statistics.pstdev(self.scores)
 
     def max(self) -> float:
-        return float(np.max(self.scores))
+        return float(max(self.scores))
 
     def min(self) -> float:
-        return float(np.min(self.scores))
+        return float(min(self.scores))
 
     def spread(self) -> float:
         return self.max() - self.min()
@@ -50,15 +99,47 @@ class MultiResult:
     def __iter__(self):
         return iter(self.scores)
 
-    def as_knockout_result(self, metric: Metric) -> "MultiResult":
-        return MultiResult(
-            params=self.params, scores=[metric.worst(self)] * len(self.scores)
-        )
+    def as_knockout_result(self, worst_score: float) -> "MultiResult":
+        """
+        Returns a copy in which every run is replaced by the given worst score, such that
+        the metric does not have to scan the scores again.
+        """
+        return MultiResult(params=self.params, scores=[worst_score] * len(self.scores))
 
     def __repr__(self) -> str:
         return "MultiResult(scores=%s, params=%s)" % (self.scores, self.params)
 
 
+def is_significantly_better(
+    metric: Metric, candidate: MultiResult, reference: MultiResult, alpha: float = 0.05
+) -> bool:
+    """
+    Tests with a one-sided Welch's t-test whether the candidate has a better mean score than
+    the reference. Unlike comparing the means directly, this does not accept differences
+    that are likely caused by the randomness of the solver.
+    """
+    if metric.comp(candidate.mean(), reference.mean()) != Comparison.BETTER:
+        return False
+    if min(len(candidate), len(reference)) < 2 or (
+        candidate.spread() == 0 and reference.spread() == 0
+    ):
+        # The test is undefined without variation, but the means differ.
+        return True
+    from scipy import stats
+
+    p_value = stats.ttest_ind_from_stats(
+        candidate.mean(),
+        statistics.stdev(candidate.scores),
+        len(candidate),
+        reference.mean(),
+        statistics.stdev(reference.scores),
+        len(reference),
+        equal_var=False,
+        alternative="greater" if metric.direction == "maximize" else "less",
+    ).pvalue
+    return p_value < alpha
+
+
 class CachingScorer:
     """
     Computing the score for a given set of parameters involves running the solver multiple times.
@@ -71,30 +152,57 @@ class CachingScorer:
         model: cp_model.CpModel,
         metric: Metric,
         fixed_params: dict[str, float | int | bool | list | tuple] | None = None,
+        cache_file: Path | str | None = None,
     ) -> None:
+        """
+        Args:
+            model: The model to solve.
+            metric: The metric to score the runs with.
+            fixed_params: Parameters that are set for every run and are not part of the keys.
+            cache_file: An optional SQLite file to persist the scores in, such that later
+                        tuning runs on the same model and metric can reuse them.
+        """
         self.model = model
         self.metric = metric
-        self._cache: dict[frozenset, MultiResult] = {}
+        self._cache: dict[tuple, MultiResult] = {}
+        # Optuna may call `evaluate` from multiple threads (`n_jobs > 1`).
+        self._lock = threading.Lock()
+        self._key_locks: dict[tuple, threading.Lock] = {}
         self.fixed_params = (
             fixed_params.copy() if fixed_params else {}
         )  # DO NOT MODIFY THIS DICTIONARY
         self.direction = metric.direction
+        self._fixed_parameters, self._fixed_subsolver = self._build_fixed_parameters()
+        self._has_fixed_subsolver_params = any(
+            _SETTERS[key][0] for key in self.fixed_params
+        )
+        # The parameter messages per key, as a configuration is usually evaluated
+        # several times, e.g., for the trial and again for its verification.
+        self._parameters: dict[tuple, sat_parameters_pb2.SatParameters] = {}
+        # CpSolver is not thread-safe, so every thread gets its own instance.
+        self._thread_local = threading.local()
+        # Identifies the model, the metric, and the fixed parameters, i.e., everything
+        # that must be equal for the scores to be comparable.
+        self.namespace = compute_namespace(
+            model, metric, self._create_key_from_params(self.fixed_params)
+        )
+        self._disk_cache = (
+            DiskCache(cache_file, self.namespace) if cache_file is not None else None
+        )
 
     def _create_key_from_params(
         self, params: dict[str, float | int | bool | list | tuple]
-    ) -> frozenset:
-        def _replace_lists(value):
-            if isinstance(value, list):
-                return tuple(sorted(value))
-            if isinstance(value, tuple):
-                return tuple(sorted(value))
-            return value
-
-        param_set = frozenset(
-            (key, _replace_lists(value)) for key, value in params.items()
+    ) -> tuple:
+        """
+        Creates a canonical, hashable key from the parameters. The items are sorted
+        by name such that the order of the dictionary does not matter.
+        """
+        param_key = tuple(
+            (key, _to_hashable(value)) for key, value in sorted(params.items())
         )
-        logging.debug("Created key from params: %s", param_set)
-        return param_set
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Created key from params: %s", param_key)
+        return param_key
 
     def _remove_fixed_params(
         self, params: dict[str, float | int | bool | list | tuple]
@@ -102,90 +210,233 @@ class CachingScorer:
         cleaned_params = {
             key: value for key, value in params.items() if key not in self.fixed_params
         }
-        logging.debug("Removed fixed params: %s", cleaned_params)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Removed fixed params: %s", cleaned_params)
         return cleaned_params
 
-    def _prepare_solver(
-        self, params: dict[str, float | int | bool | list | tuple]
-    ) -> cp_model.CpSolver:
-        solver = cp_model.CpSolver()
+    def _build_fixed_parameters(
+        self,
+    ) -> tuple[sat_parameters_pb2.SatParameters, sat_parameters_pb2.SatParameters]:
+        """
+        Builds the templates for the top level and the subsolver parameters with all
+        fixed parameters already set. They are copied for every solve.
+        """
+        parameters = sat_parameters_pb2.SatParameters()
         subsolver = sat_parameters_pb2.SatParameters()
         subsolver.name = "tuned_solver"
-        has_subsolver_params = False
-        for key, value in params.items():
-            is_subsolver_param = get_parameter_by_name(key).subsolver
-            level = subsolver if is_subsolver_param else solver.parameters
-            if is_subsolver_param:
-                has_subsolver_params = True
-            if isinstance(value, (list, tuple)):
-                getattr(level, key).extend(value)
-            else:
-                setattr(level, key, value)
         for key, value in self.fixed_params.items():
-            is_subsolver_param = get_parameter_by_name(key).subsolver
-            level = subsolver if is_subsolver_param else solver.parameters
+            is_subsolver_param, setter = _SETTERS[key]
+            setter(subsolver if is_subsolver_param else parameters, value)
+        return parameters, subsolver
+
+    def _get_solver(self) -> cp_model.CpSolver:
+        """
+        Returns the solver of the current thread. The solver is reused for all runs,
+        as its parameters are completely replaced before every solve.
+        """
+        solver = getattr(self._thread_local, "solver", None)
+        if solver is None:
+            solver = cp_model.CpSolver()
+            self._thread_local.solver = solver
+        return solver
+
+    def _build_parameters(
+        self, params: dict[str, float | int | bool | list | tuple]
+    ) -> sat_parameters_pb2.SatParameters:
+        """
+        Builds the complete parameter message for the given parameters. This is done once
+        per evaluation, such that the runs only have to copy the message.
+        """
+        parameters = sat_parameters_pb2.SatParameters()
+        parameters.CopyFrom(self._fixed_parameters)
+        subsolver = sat_parameters_pb2.SatParameters()
+        subsolver.CopyFrom(self._fixed_subsolver)
+        has_subsolver_params = self._has_fixed_subsolver_params
+        for key, value in params.items():
+            is_subsolver_param, setter = _SETTERS[key]
             if is_subsolver_param:
                 has_subsolver_params = True
-            if isinstance(value, (list, tuple)):
-                getattr(level, key).extend(value)
+                setter(subsolver, value)
             else:
-                setattr(level, key, value)
+                setter(parameters, value)
         if has_subsolver_params:
-            solver.parameters.subsolver_params.append(subsolver)
-            solver.parameters.extra_subsolvers.append(subsolver.name)
-        logging.debug("Solver prepared with params: %s", params)
-        return solver
+            parameters.subsolver_params.append(subsolver)
+            parameters.extra_subsolvers.append(subsolver.name)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Parameters built for params: %s", params)
+        return parameters
+
+    def _load_scores(self, param_key: tuple, result: MultiResult) -> None:
+        """
+        Adds the runs from the disk cache that are not yet part of the result, i.e., those of
+        previous tuning runs and those that parallel processes have added in the meantime.
+        """
+        if self._disk_cache is None:
+            return
+        scores = self._disk_cache.load_new(param_key)
+        if scores:
+            logger.info("Loaded %d runs from the disk cache.", len(scores))
+            result.scores.extend(scores)
+
+    def _is_knocked_out(
+        self,
+        result: MultiResult,
+        knockout_score: float | None,
+        knockout_reference: MultiResult | None,
+    ) -> bool:
+        """
+        A result is knocked out if the median of its runs is not better than the knockout score,
+        or if it is significantly worse than the reference. At least two, respectively three,
+        runs are required, such that a single unlucky run does not discard a good configuration.
+        """
+        if len(result) < 2:
+            return False
+        if knockout_score is not None and self.metric.comp(
+            result.median(), knockout_score
+        ) in (Comparison.WORSE, Comparison.EQUAL):
+            return True
+        return (
+            knockout_reference is not None
+            and len(result) >= 3
+            and is_significantly_better(self.metric, knockout_reference, result)
+        )
+
+    def _run(self, parameters: sat_parameters_pb2.SatParameters) -> float:
+        solver = self._get_solver()
+        solver.parameters.CopyFrom(parameters)
+        # All runs share the same model instance. OR-Tools has no public API to pass
+        # an already serialized model, so we cannot save the conversion per solve.
+        score = self.metric(solver, self.model)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Run completed with score: %s", score)
+        return score
+
+    def _store_score(self, param_key: tuple, score: float) -> None:
+        if self._disk_cache is not None:
+            self._disk_cache.append(param_key, score)
+
+    def num_cached_runs(
+        self, params: dict[str, float | int | bool | list | tuple]
+    ) -> int:
+        """
+        Returns the number of runs that are already cached for the parameters.
+        """
+        param_key = self._create_key_from_params(self._remove_fixed_params(params))
+        with self._lock:
+            result = self._cache.get(param_key)
+        return len(result) if result is not None else 0
+
+    def _run_many(
+        self, parameters: sat_parameters_pb2.SatParameters, num_runs: int, n_jobs: int
+    ) -> Iterator[float]:
+        """
+        Yields the scores of the runs as soon as they complete. With multiple jobs, the runs
+        are executed in a thread pool, and closing the generator early, e.g., after a knockout,
+        cancels the runs that have not started yet.
+        """
+        if n_jobs <= 1 or num_runs <= 1:
+            for _ in range(num_runs):
+                yield self._run(parameters)
+            return
+        executor = ThreadPoolExecutor(max_workers=min(n_jobs, num_runs))
+        try:
+            futures = [executor.submit(self._run, parameters) for _ in range(num_runs)]
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            # Runs that are already in progress cannot be interrupted and are discarded.
+            executor.shutdown(wait=True, cancel_futures=True)
 
     def evaluate(
         self,
         params: dict[str, float | int | bool | list | tuple],
         num_runs: int = 1,
         knockout_score: float | None = None,
+        n_jobs: int = 1,
+        on_run: Callable[[MultiResult], None] | None = None,
+        knockout_reference: MultiResult | None = None,
+        stop_early: Callable[[MultiResult], bool] | None = None,
     ) -> MultiResult:
         """
         Args:
             params: The parameters to evaluate.
             num_runs: The number of runs to average the score over.
-            knockout_score: Abort early if the score is worse than this value.
+            knockout_score: Abort early if the median score is worse than this value.
+            n_jobs: The number of runs to execute in parallel threads. The runs are independent,
+                    and a knockout cancels the runs that have not started yet. Make sure that
+                    `n_jobs` times the number of workers of CP-SAT does not exceed the number
+                    of available cores.
+            on_run: Called with the intermediate result after every completed run, e.g., to
+                    report it to an Optuna pruner. Exceptions are propagated to the caller.
+            knockout_reference: Abort early if the runs are significantly worse than this result
+                                according to Welch's t-test, e.g., the baseline. This stops
+                                consistently mediocre configurations that never trigger the
+                                knockout score.
+            stop_early: Called with the intermediate result after every completed run. Once it
+                        returns True, no further runs are taken and the result is returned
+                        as it is, e.g., because a statistical test is already decided.
         """
-        logging.info(
+        logger.info(
             "Evaluating with params: %s, num_runs: %s, knockout_score: %s",
             params,
             num_runs,
             knockout_score,
         )
         params = self._remove_fixed_params(params)
-        param_key: frozenset = self._create_key_from_params(params)
-        result = self._cache.get(param_key, MultiResult(scores=[], params=params))
-        if len(result) >= num_runs:
-            logging.info("Returning cached result.")
+        param_key: tuple = self._create_key_from_params(params)
+        with self._lock:
+            result = self._cache.get(param_key)
+            if result is None:
+                result = MultiResult(scores=[], params=params)
+                self._cache[param_key] = result
+            key_lock = self._key_locks.setdefault(param_key, threading.Lock())
+        # Only one thread adds runs to a configuration at a time. The others wait and then
+        # find the runs in the cache, instead of solving the same configuration again.
+        with key_lock:
+            # Other processes may have added runs since this configuration was last seen.
+            self._load_scores(param_key, result)
+            if len(result) >= num_runs:
+                logger.info("Returning cached result.")
+                return result
+            if self._is_knocked_out(result, knockout_score, knockout_reference):
+                logger.info("Returning cached knockout result.")
+                return result.as_knockout_result(self.metric.worst(result))
+            parameters = self._parameters.get(param_key)
+            if parameters is None:
+                parameters = self._build_parameters(params)
+                self._parameters[param_key] = parameters
+            n_missing = num_runs - len(result)
+            with closing(self._run_many(parameters, n_missing, n_jobs)) as runs:
+                for score in runs:
+                    result.scores.append(score)
+                    self._store_score(param_key, score)
+                    if on_run is not None:
+                        on_run(result)
+                    if self._is_knocked_out(result, knockout_score, knockout_reference):
+                        logger.info("Returning knockout result.")
+                        return result.as_knockout_result(self.metric.worst(result))
+                    if stop_early is not None and stop_early(result):
+                        logger.info("Stopping early after %d runs.", len(result))
+                        return result
+            logger.info("Evaluation completed and result cached.")
             return result
-        if knockout_score is not None and len(result) > 0:
-            worst_score = self.metric.worst(result)
-            if self.metric.comp(worst_score, knockout_score) in (
-                Comparison.WORSE,
-                Comparison.EQUAL,
-            ):
-                logging.info("Returning cached knockout result.")
-                return result.as_knockout_result(self.metric)
-        n_missing = num_runs - len(result)
-        for _ in range(n_missing):
-            solver = self._prepare_solver(params)
-            score = self.metric(solver, self.model)
-            result.scores.append(score)
-            logging.debug("Run completed with score: %s", score)
-            if knockout_score is not None:
-                if self.metric.comp(score, knockout_score) in (
-                    Comparison.WORSE,
-                    Comparison.EQUAL,
-                ):
-                    self._cache[param_key] = result
-                    logging.info("Returning knockout result.")
-                    return result.as_knockout_result(self.metric)
-        self._cache[param_key] = result
-        logging.info("Evaluation completed and result cached.")
-        return result
+
+    def clear_cache(self) -> None:
+        """
+        Forgets all scores, including those persisted for this model and metric in the
+        cache file, e.g., after updating OR-Tools, which invalidates old runtimes.
+        Results that have already been returned are not updated, so call this before
+        building a strategy on the scorer, or use `OptunaCpSatStrategy.clear_cache`.
+        """
+        with self._lock:
+            self._cache.clear()
+        if self._disk_cache is not None:
+            self._disk_cache.clear()
 
     def __iter__(self):
-        logging.debug("Iterating over cached results.")
-        return iter(self._cache.values())
+        logger.debug("Iterating over cached results.")
+        # Take a snapshot, as other threads may add results while we iterate.
+        # Results that have not completed a single run yet are skipped.
+        with self._lock:
+            results = [result for result in self._cache.values() if len(result) > 0]
+        return iter(results)
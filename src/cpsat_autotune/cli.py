@@ -1,4 +1,8 @@
+import os
+from pathlib import Path
+
 import click
+import optuna
 from .model_loading import import_model
 from .tune import (
     tune_for_gap_within_timelimit,
@@ -8,40 +12,209 @@ from .tune import (
 
 import logging
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[logging.StreamHandler()],
-)
 logger = logging.getLogger(__name__)
 
 
+def _model_cache_dir() -> Path | None:
+    """
+    Models in the text format are converted to the binary format once and kept in this
+    directory, such that repeated tuning sessions do not have to parse them again.
+    Returns None if there is no home directory to put the cache in.
+    """
+    if "XDG_CACHE_HOME" in os.environ:
+        return Path(os.environ["XDG_CACHE_HOME"]) / "cpsat-autotune"
+    try:
+        return Path.home() / ".cache" / "cpsat-autotune"
+    except RuntimeError:
+        logger.warning("No home directory found. Models will not be cached.")
+        return None
+
+
 @click.group()
 def cli():
     """CLI for CP-SAT hyperparameter tuning."""
-    pass
+    # Only the command line configures logging, such that importing this module
+    # does not change the logging of the importing application.
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        handlers=[logging.StreamHandler()],
+    )
 
 
-def _estimate_time(max_time, n_trials, n_samples):
-    expected_time = max_time * n_samples * n_trials
+def _estimate_time(max_time, n_trials, n_samples, jobs=1, time_budget=None):
+    expected_time = max_time * n_samples * n_trials / jobs
+    if time_budget is not None:
+        expected_time = min(expected_time, time_budget)
     # convert to hours and minutes
     hours = int(expected_time // 3600)
     minutes = int((expected_time % 3600) // 60)
     if hours > 0:
-        logging.info(
-            f"The expected time for the tuning process is {hours} hours and {minutes} minutes."
+        logger.info(
+            "The expected time for the tuning process is %d hours and %d minutes.",
+            hours,
+            minutes,
         )
     else:
-        logging.info(f"The expected time for the tuning process is {minutes} minutes.")
-    logging.info(
+        logger.info("The expected time for the tuning process is %d minutes.", minutes)
+    logger.info(
         "The tuning algorithm will try to take shortcuts whenever possible, potentially reducing the time drastically."
     )
-    logging.info(
+    logger.info(
         "To reduce the expected time, you can try to reduce the number of trials or samples per trial, as well as the maximum time allowed for each solve operation. However, this may affect the reliability of the tuning process."
     )
 
 
+def _create_pruner(
+    pruner: str, min_samples_before_prune: int, n_samples_trial: int
+) -> optuna.pruners.BasePruner | None:
+    """
+    Creates the Optuna pruner selected on the command line. The pruners only act on trials
+    that have taken at least `min_samples_before_prune` samples.
+    """
+    if pruner == "median":
+        return optuna.pruners.MedianPruner(
+            n_startup_trials=5, n_warmup_steps=min_samples_before_prune
+        )
+    if pruner == "hyperband":
+        return optuna.pruners.HyperbandPruner(
+            min_resource=min_samples_before_prune,
+            max_resource=max(n_samples_trial, min_samples_before_prune),
+            reduction_factor=3,
+        )
+    return None
+
+
+# The options shared by all tuning commands.
+_COMMON_OPTIONS = [
+    click.option(
+        "--n-trials",
+        type=int,
+        default=100,
+        help="Number of trials to execute in the tuning process.",
+    ),
+    click.option(
+        "--n-samples-trial",
+        type=int,
+        default=10,
+        help="Number of samples to take in each trial.",
+    ),
+    click.option(
+        "--n-samples-verification",
+        type=int,
+        default=30,
+        help="Number of samples for verifying parameters.",
+    ),
+    click.option(
+        "--pruner",
+        type=click.Choice(["median", "hyperband", "none"]),
+        default="none",
+        help="Optuna pruner to stop trials with bad parameters before all samples are taken.",
+    ),
+    click.option(
+        "--min-samples-before-prune",
+        type=int,
+        default=2,
+        help="Minimum number of samples of a trial before it can be pruned.",
+    ),
+    click.option(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of trials to run in parallel. The cores are split among the jobs unless --num-workers is given.",
+    ),
+    click.option(
+        "--jobs-per-trial",
+        type=int,
+        default=1,
+        help="Number of runs of a single trial to execute in parallel. Knocked out trials cancel their remaining runs.",
+    ),
+    click.option(
+        "--num-workers",
+        type=int,
+        default=None,
+        help="Fix the number of workers of CP-SAT instead of tuning it. CP-SAT itself uses all cores by default.",
+    ),
+    click.option(
+        "--sampler",
+        type=click.Choice(["tpe", "random"]),
+        default="tpe",
+        help="Optuna sampler to explore the parameter space.",
+    ),
+    click.option(
+        "--time-budget",
+        type=float,
+        default=None,
+        help="Hard wall-clock limit for the trials in seconds. The final evaluation is not included.",
+    ),
+    click.option(
+        "--patience",
+        type=int,
+        default=0,
+        help="Stop early if the best trial did not change for this many trials after the initial design. Disabled by default (0).",
+    ),
+    click.option(
+        "--journal-file",
+        type=click.Path(dir_okay=False),
+        default=None,
+        help="Store the Optuna study in this journal file. Processes sharing the file work on the same study.",
+    ),
+    click.option(
+        "--cache-file",
+        type=click.Path(dir_okay=False),
+        default=None,
+        help="Persist the scores of all solves in this SQLite file. Later runs reuse them, and parallel processes pick up each other's runs.",
+    ),
+    click.option(
+        "--clear-cache",
+        is_flag=True,
+        default=False,
+        help="Discard the scores stored in the cache file for this model and metric before tuning, e.g., after updating OR-Tools.",
+    ),
+]
+
+
+def _common_options(command):
+    """
+    Adds the options shared by all tuning commands, in the order of `_COMMON_OPTIONS`.
+    """
+    for option in reversed(_COMMON_OPTIONS):
+        command = option(command)
+    return command
+
+
+def _run_tuning(tune_function, max_time, **kwargs) -> dict:
+    """
+    Translates the common options to the arguments of the tuning functions,
+    logs the expected time, and runs the tuning.
+    """
+    n_trials = kwargs.pop("n_trials")
+    n_samples_trial = kwargs.pop("n_samples_trial")
+    jobs = kwargs.pop("jobs")
+    jobs_per_trial = kwargs.pop("jobs_per_trial")
+    time_budget = kwargs.pop("time_budget")
+    patience = kwargs.pop("patience")
+    pruner = kwargs.pop("pruner")
+    min_samples_before_prune = kwargs.pop("min_samples_before_prune")
+    _estimate_time(
+        max_time, n_trials, n_samples_trial, jobs * jobs_per_trial, time_budget
+    )
+    model = import_model(kwargs.pop("model_path"), cache_dir=_model_cache_dir())
+    return tune_function(
+        model=model,
+        max_time_in_seconds=max_time,
+        n_samples_for_trial=n_samples_trial,
+        n_samples_for_verification=kwargs.pop("n_samples_verification"),
+        n_trials=n_trials,
+        pruner=_create_pruner(pruner, min_samples_before_prune, n_samples_trial),
+        n_jobs=jobs,
+        n_jobs_per_trial=jobs_per_trial,
+        timeout=time_budget,
+        patience=patience if patience > 0 else None,
+        **kwargs,
+    )
+
+
 @click.command(
     help="""
     Tune CP-SAT hyperparameters to minimize the time required to find an optimal solution.
@@ -64,42 +237,14 @@ def _estimate_time(max_time, n_trials, n_samples):
     default=0.0,
     help="Relative optimality gap for considering a solution as optimal.",
 )
-@click.option(
-    "--n-trials",
-    type=int,
-    default=100,
-    help="Number of trials to execute in the tuning process.",
-)
-@click.option(
-    "--n-samples-trial",
-    type=int,
-    default=10,
-    help="Number of samples to take in each trial.",
-)
-@click.option(
-    "--n-samples-verification",
-    type=int,
-    default=30,
-    help="Number of samples for verifying parameters.",
-)
-def time(
-    model_path,
-    max_time,
-    relative_gap,
-    n_trials,
-    n_samples_trial,
-    n_samples_verification,
-):
+@_common_options
+def time(max_time, relative_gap, **kwargs):
     """Tune CP-SAT hyperparameters to minimize the time required to find an optimal solution."""
-    _estimate_time(max_time, n_trials, n_samples_trial)
-    model = import_model(model_path)
-    best_params = tune_time_to_optimal(
-        model=model,
-        max_time_in_seconds=max_time,
+    best_params = _run_tuning(
+        tune_time_to_optimal,
+        max_time,
         relative_gap_limit=relative_gap,
-        n_samples_for_trial=n_samples_trial,
-        n_samples_for_verification=n_samples_verification,
-        n_trials=n_trials,
+        **kwargs,
     )
     click.echo(f"Best parameters: {best_params}")
 
@@ -133,44 +278,15 @@ def time(
     required=True,
     help="Direction to optimize the objective value.",
 )
-@click.option(
-    "--n-trials",
-    type=int,
-    default=100,
-    help="Number of trials to execute in the tuning process.",
-)
-@click.option(
-    "--n-samples-trial",
-    type=int,
-    default=10,
-    help="Number of samples to take in each trial.",
-)
-@click.option(
-    "--n-samples-verification",
-    type=int,
-    default=30,
-    help="Number of samples for verifying parameters.",
-)
-def quality(
-    model_path,
-    max_time,
-    obj_for_timeout,
-    direction,
-    n_trials,
-    n_samples_trial,
-    n_samples_verification,
-):
+@_common_options
+def quality(max_time, obj_for_timeout, direction, **kwargs):
     """Tune CP-SAT hyperparameters to maximize or minimize solution quality within a given time limit."""
-    _estimate_time(max_time, n_trials, n_samples_trial)
-    model = import_model(model_path)
-    best_params = tune_for_quality_within_timelimit(
-        model=model,
-        max_time_in_seconds=max_time,
+    best_params = _run_tuning(
+        tune_for_quality_within_timelimit,
+        max_time,
         obj_for_timeout=obj_for_timeout,
         direction=direction,
-        n_samples_for_trial=n_samples_trial,
-        n_samples_for_verification=n_samples_verification,
-        n_trials=n_trials,
+        **kwargs,
     )
     click.echo(f"Best parameters: {best_params}")
 
@@ -191,38 +307,14 @@ def quality(
     required=True,
     help="The time limit for each solve operation in seconds.",
 )
-@click.option(
-    "--n-samples-trial",
-    type=int,
-    default=10,
-    help="The number of samples to take in each trial. Defaults to 10.",
-)
-@click.option(
-    "--n-samples-verification",
-    type=int,
-    default=30,
-    help="The number of samples for verifying parameters. Defaults to 30.",
-)
-@click.option(
-    "--n-trials",
-    type=int,
-    default=100,
-    help="The number of trials to execute in the tuning process. Defaults to 100.",
-)
 @click.option(
     "--limit", type=int, default=10, help="The limit for the gap. Defaults to 10."
 )
-def gap(model_path, max_time, n_samples_trial, n_samples_verification, n_trials, limit):
+@_common_options
+def gap(max_time, limit, **kwargs):
     """Tune CP-SAT hyperparameters to minimize the gap within a given time limit."""
-    _estimate_time(max_time, n_trials, n_samples_trial)
-    model = import_model(model_path)
-    best_params = tune_for_gap_within_timelimit(
-        model=model,
-        max_time_in_seconds=max_time,
-        n_samples_for_trial=n_samples_trial,
-        n_samples_for_verification=n_samples_verification,
-        n_trials=n_trials,
-        limit=limit,
+    best_params = _run_tuning(
+        tune_for_gap_within_timelimit, max_time, limit=limit, **kwargs
     )
     click.echo(f"Best parameters: {best_params}")
 
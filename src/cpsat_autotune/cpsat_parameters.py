@@ -123,10 +123,12 @@ Higher levels of probing can result in a more simplified problem but require mor
         """,
         subsolver=False,  # Presolve is done before the search
     ),
+    # A log-spaced grid instead of a continuous range, such that the default can be
+    # sampled again, and equal configurations share their cache entries.
     IntFromOrderedListParameter(
         name="presolve_probing_deterministic_time_limit",
-        default_index=4,
-        values=[0.1, 1.0, 5.0, 10.0, 30.0],
+        default_index=8,
+        values=[0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0],
         description="""
 Sets a deterministic time limit for probing during presolve.
 This parameter ensures that the presolve phase does not consume too much time, allowing the solver to proceed to the main search phase in a timely manner.
@@ -400,12 +402,19 @@ A value of `0` will use the number of available CPU cores.
     ),
 ]
 
+_PARAMETERS_BY_NAME: dict[str, CpSatParameter] = {
+    param.name: param for param in CPSAT_PARAMETERS
+}
+assert len(_PARAMETERS_BY_NAME) == len(
+    CPSAT_PARAMETERS
+), "Every parameter must only be defined once."
+
 
 def get_parameter_by_name(name: str) -> CpSatParameter:
     """
     Returns the parameter with the given name.
     """
-    for param in CPSAT_PARAMETERS:
-        if param.name == name:
-            return param
-    raise KeyError(f"Parameter '{name}' not found.")
+    try:
+        return _PARAMETERS_BY_NAME[name]
+    except KeyError:
+        raise KeyError(f"Parameter '{name}' not found.") from None
@@ -0,0 +1,116 @@
+"""
+This module provides a persistent cache for the scores of parameter configurations.
+Repeated tuning runs on the same model can thus reuse the solves of previous runs,
+which are by far the most expensive part of the tuning.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import uuid
+from pathlib import Path
+
+from ortools.sat.python import cp_model
+
+from .metrics import Metric
+
+
+def compute_namespace(
+    model: cp_model.CpModel, metric: Metric, fixed_params: tuple
+) -> str:
+    """
+    Computes a hash that identifies the model, the configuration of the metric, and the
+    fixed parameters. Scores are only comparable if all of them are equal.
+    """
+    hasher = hashlib.sha256()
+    hasher.update(model.Proto().SerializeToString(deterministic=True))
+    hasher.update(type(metric).__name__.encode())
+    hasher.update(repr(sorted(vars(metric).items())).encode())
+    hasher.update(repr(fixed_params).encode())
+    return hasher.hexdigest()
+
+
+class DiskCache:
+    """
+    Stores the scores of parameter configurations in an SQLite database.
+    The entries are grouped by a namespace, see `compute_namespace`, such that
+    a single file can be used for multiple models and metrics.
+
+    Every run is stored as a separate row, such that multiple processes can append
+    to the same file without overwriting each other's runs. Each instance only returns
+    the runs it has neither written nor returned before, see `load_new`.
+    """
+
+    def __init__(self, path: Path | str, namespace: str) -> None:
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        # Identifies the runs written by this instance, which it already knows.
+        self._writer = uuid.uuid4().hex
+        # The largest row id returned by `load_new` for every key.
+        self._last_ids: dict[str, int] = {}
+        # Other processes may hold the lock of the database for a moment.
+        self._connection = sqlite3.connect(
+            str(path), check_same_thread=False, isolation_level=None, timeout=60.0
+        )
+        # AUTOINCREMENT guarantees increasing row ids, even after rows have been deleted.
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS runs ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "namespace TEXT, key TEXT, writer TEXT, score REAL)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS runs_by_key ON runs (namespace, key, id)"
+        )
+
+    def get(self, key: tuple) -> list[float]:
+        """
+        Returns all stored scores for the given parameter key in the order they were added.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT score FROM runs WHERE namespace = ? AND key = ? ORDER BY id",
+                (self.namespace, repr(key)),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def load_new(self, key: tuple) -> list[float]:
+        """
+        Returns the scores for the given parameter key that were written by other instances,
+        e.g., other processes, and have not been returned by this method before.
+        """
+        key_repr = repr(key)
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT id, score FROM runs "
+                "WHERE namespace = ? AND key = ? AND id > ? AND writer != ? ORDER BY id",
+                (
+                    self.namespace,
+                    key_repr,
+                    self._last_ids.get(key_repr, 0),
+                    self._writer,
+                ),
+            ).fetchall()
+            if rows:
+                self._last_ids[key_repr] = rows[-1][0]
+        return [score for _, score in rows]
+
+    def append(self, key: tuple, score: float) -> None:
+        """
+        Stores the score of a single run for the given parameter key.
+        """
+        with self._lock:
+            self._connection.execute(
+                "INSERT INTO runs (namespace, key, writer, score) VALUES (?, ?, ?, ?)",
+                (self.namespace, repr(key), self._writer, score),
+            )
+
+    def clear(self) -> None:
+        """
+        Removes all scores of this namespace. The entries of other models and metrics in
+        the same file are kept.
+        """
+        with self._lock:
+            self._connection.execute(
+                "DELETE FROM runs WHERE namespace = ?", (self.namespace,)
+            )
+            self._last_ids.clear()
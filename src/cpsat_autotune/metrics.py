@@ -1,21 +1,39 @@
 import logging
 from abc import ABC, abstractmethod
-from datetime import datetime
 from enum import Enum
 import random
+from time import perf_counter
 from typing import Iterable, Callable, TypeVar, Any
+from ortools.sat import sat_parameters_pb2
 from ortools.sat.python import cp_model
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[logging.StreamHandler()],
-)
 logger = logging.getLogger(__name__)
 
 T = TypeVar("T")
 
+# A dedicated generator, such that the seeds of the solver do not depend on (or consume)
+# the global random state of the application.
+_rng = random.Random()
+
+
+def _random_seed() -> int:
+    """
+    Returns a random seed for the solver in the range of a non-negative int32.
+    """
+    return _rng.getrandbits(31)
+
+
+def _apply_parameters(
+    solver: cp_model.CpSolver, parameters: sat_parameters_pb2.SatParameters
+) -> None:
+    """
+    Merges the static parameters of a metric into the parameters of the solver, which
+    have already been set for the evaluated configuration, and draws a new seed.
+    A single merge is cheaper than setting each field through the Python wrapper.
+    """
+    solver.parameters.MergeFrom(parameters)
+    solver.parameters.random_seed = _random_seed()
+
 
 class Comparison(Enum):
     WORSE = 0
@@ -23,6 +41,29 @@ class Comparison(Enum):
     BETTER = 2
 
 
+# Indexed by the sign of a comparison, shifted by one.
+_COMPARISONS = (Comparison.WORSE, Comparison.EQUAL, Comparison.BETTER)
+
+
+def _select(values: Iterable[T], key: Callable[[T], Any], sign: int) -> T:
+    """
+    Returns the first value with the maximal `sign * key(value)`. This is a plain loop
+    instead of `max` with a wrapping lambda, such that there is only a single Python call
+    per value.
+    """
+    iterator = iter(values)
+    try:
+        selected = next(iterator)
+    except StopIteration:
+        raise ValueError("Cannot select from an empty sequence.") from None
+    selected_key = sign * key(selected)
+    for value in iterator:
+        value_key = sign * key(value)
+        if value_key > selected_key:
+            selected, selected_key = value, value_key
+    return selected
+
+
 class Metric(ABC):
     """
     A metric that describes how good a run of the solver was.
@@ -36,6 +77,8 @@ class Metric(ABC):
             )
             raise ValueError("Direction must be either 'minimize' or 'maximize'.")
         self.direction = direction
+        # Multiplying with the sign turns every comparison into a maximization.
+        self._sign = 1 if direction == "maximize" else -1
         logger.info("Initialized Metric with direction: %s", direction)
 
     @abstractmethod
@@ -50,9 +93,7 @@ class Metric(ABC):
         """
         Returns the best value according to the metric's direction.
         """
-        best_value = max(
-            values, key=key if self.direction == "maximize" else (lambda x: -key(x))
-        )
+        best_value = _select(values, key, self._sign)
         logger.debug("Best value found: %s", best_value)
         return best_value
 
@@ -60,9 +101,7 @@ class Metric(ABC):
         """
         Returns the worst value according to the metric's direction.
         """
-        worst_value = min(
-            values, key=key if self.direction == "maximize" else (lambda x: -key(x))
-        )
+        worst_value = _select(values, key, -self._sign)
         logger.debug("Worst value found: %s", worst_value)
         return worst_value
 
@@ -72,18 +111,7 @@ class Metric(ABC):
         """
         ka, kb = key(a), key(b)
         logger.debug("Comparing values: %s vs %s", ka, kb)
-        if ka == kb:
-            return Comparison.EQUAL
-        if self.direction == "maximize":
-            if ka > kb:
-                return Comparison.BETTER
-            else:
-                return Comparison.WORSE
-        else:
-            if ka < kb:
-                return Comparison.BETTER
-            else:
-                return Comparison.WORSE
+        return _COMPARISONS[self._sign * ((ka > kb) - (ka < kb)) + 1]
 
     @abstractmethod
     def knockout_score(self) -> float:
@@ -100,38 +128,43 @@ class Metric(ABC):
         pass
 
 
-class MaxObjective(Metric):
+class ObjectiveMetric(Metric):
     """
-    This metric tries maximize the objective value within a time limit.
+    The objective value of the best solution found within a time limit. MaxObjective and
+    MinObjective only fix the direction. The value is returned as is, the direction is
+    handled by `Metric`.
     """
 
-    def __init__(self, max_time_in_seconds: float, obj_for_timeout: int):
-        """
-        Will return the objective value if a solution was found within the time limit, otherwise obj_for_timeout.
-        It does not care about the status of the solver, but only if there was a feasible solution.
-        :param obj_for_timeout: The value to return if the solver did not find any solution within the time limit.
-        """
-        super().__init__("maximize")
+    def __init__(
+        self, direction: str, max_time_in_seconds: float, obj_for_timeout: int
+    ):
+        super().__init__(direction)
         self.obj_for_timeout = obj_for_timeout
         self.max_time_in_seconds = max_time_in_seconds
+        self._parameters = sat_parameters_pb2.SatParameters(
+            max_time_in_seconds=max_time_in_seconds
+        )
 
     def __call__(
         self,
         solver: cp_model.CpSolver,
         model: cp_model.CpModel,
     ) -> float:
-        solver.parameters.random_seed = random.randint(0, 2**31 - 1)
-        solver.parameters.max_time_in_seconds = self.max_time_in_seconds
-        logger.info(
-            "Starting solver with random_seed: %s, max_time_in_seconds: %s",
-            solver.parameters.random_seed,
-            self.max_time_in_seconds,
-        )
+        _apply_parameters(solver, self._parameters)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Starting solver with random_seed: %s, max_time_in_seconds: %s",
+                solver.parameters.random_seed,
+                self.max_time_in_seconds,
+            )
         status = solver.solve(model)
         obj_value = None
         if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
             obj_value = solver.objective_value
-            logger.info("Solver found a solution with objective value: %s", obj_value)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "Solver found a solution with objective value: %s", obj_value
+                )
         else:
             logger.warning(
                 "Solver did not find a feasible solution within the time limit."
@@ -142,48 +175,30 @@ class MaxObjective(Metric):
         return self.obj_for_timeout
 
     def objective_name(self) -> str:
-        return "Objective [MAX]"
+        return f"Objective [{self.direction[:3].upper()}]"
 
 
-class MinObjective(Metric):
+class MaxObjective(ObjectiveMetric):
     """
-    Like MaxObjective, but tries to minimize the objective value within a time limit.
-    Because the metric is supposed to be maximized, the value is negated internally.
+    This metric tries maximize the objective value within a time limit.
     """
 
     def __init__(self, max_time_in_seconds: float, obj_for_timeout: int):
-        super().__init__("minimize")
-        self.obj_for_timeout = obj_for_timeout
-        self.max_time_in_seconds = max_time_in_seconds
+        """
+        Will return the objective value if a solution was found within the time limit, otherwise obj_for_timeout.
+        It does not care about the status of the solver, but only if there was a feasible solution.
+        :param obj_for_timeout: The value to return if the solver did not find any solution within the time limit.
+        """
+        super().__init__("maximize", max_time_in_seconds, obj_for_timeout)
 
-    def __call__(
-        self,
-        solver: cp_model.CpSolver,
-        model: cp_model.CpModel,
-    ) -> float:
-        solver.parameters.random_seed = random.randint(0, 2**31 - 1)
-        solver.parameters.max_time_in_seconds = self.max_time_in_seconds
-        logger.info(
-            "Starting solver with random_seed: %s, max_time_in_seconds: %s",
-            solver.parameters.random_seed,
-            self.max_time_in_seconds,
-        )
-        status = solver.solve(model)
-        obj_value = None
-        if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
-            obj_value = solver.objective_value
-            logger.info("Solver found a solution with objective value: %s", obj_value)
-        else:
-            logger.warning(
-                "Solver did not find a feasible solution within the time limit."
-            )
-        return obj_value if obj_value is not None else self.obj_for_timeout
 
-    def knockout_score(self) -> float:
-        return self.obj_for_timeout
+class MinObjective(ObjectiveMetric):
+    """
+    Like MaxObjective, but tries to minimize the objective value within a time limit.
+    """
 
-    def objective_name(self) -> str:
-        return "Objective [MIN]"
+    def __init__(self, max_time_in_seconds: float, obj_for_timeout: int):
+        super().__init__("minimize", max_time_in_seconds, obj_for_timeout)
 
 
 class MinTimeToOptimal(Metric):
@@ -204,30 +219,35 @@ class MinTimeToOptimal(Metric):
         self.max_time_in_seconds = max_time_in_seconds
         self.absolute_gap_limit = absolute_gap_limit
         self.par_multiplier = par_multiplier
+        self._parameters = sat_parameters_pb2.SatParameters(
+            max_time_in_seconds=max_time_in_seconds
+        )
+        if relative_gap_limit > 0.0:
+            self._parameters.relative_gap_limit = relative_gap_limit
+        if absolute_gap_limit > 0.0:
+            self._parameters.absolute_gap_limit = absolute_gap_limit
 
     def __call__(
         self,
         solver: cp_model.CpSolver,
         model: cp_model.CpModel,
     ) -> float:
-        solver.parameters.random_seed = random.randint(0, 2**31 - 1)
-        solver.parameters.max_time_in_seconds = self.max_time_in_seconds
-        if self.relative_gap_limit > 0.0:
-            solver.parameters.relative_gap_limit = self.relative_gap_limit
-        if self.absolute_gap_limit > 0.0:
-            solver.parameters.absolute_gap_limit = self.absolute_gap_limit
-        logger.info(
-            "Starting solver with random_seed: %s, max_time_in_seconds: %s, relative_gap_limit: %s, absolute_gap_limit: %s",
-            solver.parameters.random_seed,
-            self.max_time_in_seconds,
-            self.relative_gap_limit,
-            self.absolute_gap_limit,
-        )
-        time_begin = datetime.now()
+        _apply_parameters(solver, self._parameters)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Starting solver with random_seed: %s, max_time_in_seconds: %s, relative_gap_limit: %s, absolute_gap_limit: %s",
+                solver.parameters.random_seed,
+                self.max_time_in_seconds,
+                self.relative_gap_limit,
+                self.absolute_gap_limit,
+            )
+        time_begin = perf_counter()
         status = solver.solve(model)
-        time_end = datetime.now()
-        time_in_s = (time_end - time_begin).total_seconds()
-        logger.info("Solver completed in %s seconds with status: %s", time_in_s, status)
+        time_in_s = perf_counter() - time_begin
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Solver completed in %s seconds with status: %s", time_in_s, status
+            )
         if status == cp_model.OPTIMAL:
             return time_in_s
         else:
@@ -251,27 +271,34 @@ class MinGapWithinTimelimit(Metric):
         super().__init__(direction="minimize")
         self.max_time_in_seconds = max_time_in_seconds
         self.limit = limit
+        self._parameters = sat_parameters_pb2.SatParameters(
+            max_time_in_seconds=max_time_in_seconds
+        )
 
     def __call__(
         self,
         solver: cp_model.CpSolver,
         model: cp_model.CpModel,
     ) -> float:
-        solver.parameters.random_seed = random.randint(0, 2**31 - 1)
-        solver.parameters.max_time_in_seconds = self.max_time_in_seconds
-        logger.info(
-            "Starting solver with random_seed: %s, max_time_in_seconds: %s",
-            solver.parameters.random_seed,
-            self.max_time_in_seconds,
-        )
+        _apply_parameters(solver, self._parameters)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Starting solver with random_seed: %s, max_time_in_seconds: %s",
+                solver.parameters.random_seed,
+                self.max_time_in_seconds,
+            )
         status = solver.solve(model)
         obj_value = None
         if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
-            obj_val = solver.objective_value
-            best_bound = solver.best_objective_bound
-            gap = abs(obj_val - best_bound) / max(1, abs(obj_val))
+            # Every property access goes through the wrapper of the solver, so the
+            # values are read only once.
             obj_value = solver.objective_value
-            logger.info("Solver found a solution with objective value: %s", obj_value)
+            best_bound = solver.best_objective_bound
+            gap = abs(obj_value - best_bound) / max(1, abs(obj_value))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "Solver found a solution with objective value: %s", obj_value
+                )
         else:
             gap = float("inf")
             logger.warning(
@@ -291,25 +318,27 @@ class MinGapIntegralWithinTimelimit(Metric):
         super().__init__(direction="minimize")
         self.max_time_in_seconds = max_time_in_seconds
         self.limit = limit
+        self._parameters = sat_parameters_pb2.SatParameters(
+            max_time_in_seconds=max_time_in_seconds
+        )
 
     def __call__(
         self,
         solver: cp_model.CpSolver,
         model: cp_model.CpModel,
     ) -> float:
-        solver.parameters.random_seed = random.randint(0, 2**31 - 1)
-        solver.parameters.max_time_in_seconds = self.max_time_in_seconds
-        logger.info(
-            "Starting solver with random_seed: %s, max_time_in_seconds: %s",
-            solver.parameters.random_seed,
-            self.max_time_in_seconds,
-        )
+        _apply_parameters(solver, self._parameters)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Starting solver with random_seed: %s, max_time_in_seconds: %s",
+                solver.parameters.random_seed,
+                self.max_time_in_seconds,
+            )
         status = solver.solve(model)
-        obj_value = None
         if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
-            obj_value = solver.objective_value
             gap_integral = solver.response_proto.gap_integral
-            logger.info("Solver found a solution with objective value: %s", obj_value)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Solver finished with gap integral: %s", gap_integral)
         else:
             gap_integral = float("inf")
             logger.warning(
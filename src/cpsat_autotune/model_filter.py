@@ -5,21 +5,45 @@ space for the hyperparameter optimization by only considering relevant
 parameters.
 """
 
+from typing import Any, Callable
+
 from ortools.sat.python import cp_model
 
+# Checks for constraint types that can be present but empty.
+_IS_EMPTY: dict[str, Callable[[Any], bool]] = {
+    "no_overlap": lambda c: not c.no_overlap.intervals,
+    "no_overlap_2d": lambda c: not c.no_overlap_2d.x_intervals,
+}
+
+
+def _constraint_types(model: cp_model.CpModel) -> frozenset[str]:
+    """
+    Collects the types of all constraints of the model in a single pass. Scheduling
+    constraints without any intervals do not count, as they have no effect. The result
+    is not cached, as the model may be modified between tuning sessions.
+    """
+    types = set()
+    for constraint in model.proto.constraints:
+        kind = constraint.WhichOneof("constraint")
+        # Only the sub-message of the matching type is accessed, see `_IS_EMPTY`.
+        if kind in _IS_EMPTY and _IS_EMPTY[kind](constraint):
+            continue
+        types.add(kind)
+    return frozenset(types)
+
 
 def has_constraint_no_overlap_2d(model: cp_model.CpModel) -> bool:
     """
     Check if the model has `no_overlap_2d` constraints
     """
-    return any(c.no_overlap_2d.x_intervals for c in model.proto.constraints)
+    return "no_overlap_2d" in _constraint_types(model)
 
 
 def has_constraint_no_overlap(model: cp_model.CpModel) -> bool:
     """
     Check if the model has `no_overlap` constraints
     """
-    return any(c.no_overlap.intervals for c in model.proto.constraints)
+    return "no_overlap" in _constraint_types(model)
 
 
 def has_objective(model: cp_model.CpModel) -> bool:
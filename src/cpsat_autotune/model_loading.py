@@ -1,14 +1,69 @@
+import glob
+import hashlib
+import logging
+import mmap
+import os
+import re
+import tempfile
 from pathlib import Path
 from ortools.sat.python import cp_model
 from google.protobuf import text_format
 
+# The text format never contains these control characters, while the binary format
+# practically always does (e.g., the tag of the `variables` field is 0x12).
+_BINARY_MARKER = re.compile(rb"[\x00-\x08\x0e-\x1f]")
 
-def import_model(filepath: Path | str) -> cp_model.CpModel:
+logger = logging.getLogger(__name__)
+
+
+def _cache_prefix(filepath: Path) -> str:
+    """
+    Returns the prefix of the cached binary copies of the given file. It contains a hash
+    of the resolved path, such that files with the same name in different directories
+    do not share their copies.
+    """
+    path_digest = hashlib.sha256(str(filepath.resolve()).encode()).hexdigest()[:16]
+    return f"{filepath.name}.{path_digest}."
+
+
+def _write_cache_file(model: cp_model.CpModel, cache_file: Path, prefix: str) -> None:
+    """
+    Stores the binary copy of a model and removes the copies of previous versions of the
+    same file. The copy is written to a temporary file first and then renamed, such that
+    parallel processes or an interrupted write never leave a truncated copy behind. The
+    cache is only an optimization, so failures are just logged.
     """
-    Imports a CP-SAT model from a protobuffer file.
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=cache_file.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(model.Proto().SerializeToString())
+            os.replace(tmp_name, cache_file)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+        for outdated in cache_file.parent.glob(f"{glob.escape(prefix)}*.pb"):
+            if outdated != cache_file:
+                outdated.unlink(missing_ok=True)
+    except OSError as error:
+        logger.warning("Could not cache the model in %s: %s", cache_file, error)
+
+
+def import_model(
+    filepath: Path | str, cache_dir: Path | str | None = None
+) -> cp_model.CpModel:
+    """
+    Imports a CP-SAT model from a protobuffer file. Both, the binary and the text format
+    are supported. The binary format is much faster to parse for large models.
 
     Args:
         filepath (Path | str): Path to the file containing the model.
+        cache_dir (Path | str | None): If given, models in the text format are additionally stored
+                                       in the binary format in this directory, and later imports of the
+                                       unchanged file read the binary copy instead. The copies are
+                                       identified by the resolved path and the hash of the content.
+                                       Defaults to None.
 
     Returns:
         cp_model.CpModel: The imported CP model.
@@ -22,12 +77,52 @@ def import_model(filepath: Path | str) -> cp_model.CpModel:
         raise FileNotFoundError(f"File {filepath} does not exist.")
 
     model = cp_model.CpModel()
-    with filepath.open("r") as file:
-        text_format.Parse(file.read(), model.Proto())
+    if filepath.stat().st_size == 0:
+        return model  # Empty files cannot be memory-mapped.
+    # The file is memory-mapped, such that large binary models are parsed directly from
+    # the page cache without first copying the whole file into a bytes object.
+    with open(filepath, "rb") as file, mmap.mmap(
+        file.fileno(), 0, access=mmap.ACCESS_READ
+    ) as data:
+        if _BINARY_MARKER.search(data):
+            with memoryview(data) as view:
+                model.Proto().ParseFromString(view)
+            return model
+        cache_file = None
+        if cache_dir is not None:
+            # Hashing the content is much cheaper than parsing the text format.
+            prefix = _cache_prefix(filepath)
+            content_digest = hashlib.sha256(data).hexdigest()
+            cache_file = Path(cache_dir) / f"{prefix}{content_digest}.pb"
+            if cache_file.exists():
+                return import_model(cache_file)
+        text_format.Parse(data.read().decode("utf-8"), model.Proto())
+    if cache_file is not None:
+        _write_cache_file(model, cache_file, prefix)
 
     return model
 
 
-def export_model(model: cp_model.CpModel, filename: str):
-    with open(filename, "w") as file:
-        file.write(text_format.MessageToString(model.Proto()))
+def export_model(
+    model: cp_model.CpModel, filename: Path | str, binary: bool | None = None
+):
+    """
+    Exports a CP-SAT model to a protobuffer file.
+
+    Args:
+        model (cp_model.CpModel): The model to export.
+        filename (Path | str): The path of the file to write.
+        binary (bool | None): Write the binary format instead of the human-readable text format.
+                              The binary format is smaller and much faster to import. Defaults to None,
+                              which writes the binary format only for the `.binpb` suffix. Note that
+                              `.pb` is commonly used for both formats, and `import_model` detects the
+                              format from the content.
+    """
+    if binary is None:
+        binary = Path(filename).suffix == ".binpb"
+    if binary:
+        with open(filename, "wb") as file:
+            file.write(model.Proto().SerializeToString())
+    else:
+        with open(filename, "w") as file:
+            file.write(text_format.MessageToString(model.Proto()))
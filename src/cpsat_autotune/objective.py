@@ -1,20 +1,71 @@
+import functools
 import logging
+import math
+import statistics
 
 from .metrics import Comparison
 from .caching_solver import CachingScorer, MultiResult
 from .parameter_space import CpSatParameterSpace
 import optuna
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,  # Set the log level to INFO (can be adjusted to DEBUG for more verbosity)
-    format="%(asctime)s - %(levelname)s - %(message)s",  # Log format
-    handlers=[
-        logging.StreamHandler()  # StreamHandler logs to console, add more handlers as needed
-    ],
-)
 logger = logging.getLogger(__name__)
 
+# The baseline is sampled at least this often, before its precision is checked.
+MIN_BASELINE_SAMPLES = 10
+# The number of additional baseline samples per round.
+BASELINE_BATCH_SIZE = 5
+
+
+@functools.lru_cache(maxsize=None)
+def _t_quantile(confidence_level: float, degrees_of_freedom: int) -> float:
+    from scipy import stats
+
+    return float(stats.t.ppf((1 + confidence_level) / 2, degrees_of_freedom))
+
+
+def _is_precise(result: MultiResult, tolerance: float) -> bool:
+    """
+    Checks if the half-width of the 95% confidence interval of the mean is at most
+    `tolerance` times the mean.
+    """
+    if len(result) < 2:
+        return False
+    half_width = (
+        _t_quantile(0.95, len(result) - 1)
+        * statistics.stdev(result.scores)
+        / math.sqrt(len(result))
+    )
+    return half_width <= tolerance * abs(result.mean())
+
+
+def evaluate_baseline(
+    scorer: CachingScorer,
+    max_samples: int,
+    n_jobs: int = 1,
+    tolerance: float | None = 0.05,
+) -> MultiResult:
+    """
+    Evaluates the default parameters. Instead of always taking `max_samples` samples, the
+    samples are taken in batches until the confidence interval of the mean is tight enough,
+    which saves many solves on models with little variance. Missing samples are added
+    later, when the baseline is compared with the same number of samples.
+
+    Args:
+        scorer: The scorer to evaluate the default parameters with.
+        max_samples: The maximal number of samples.
+        n_jobs: The number of runs to execute in parallel threads.
+        tolerance: Stop once the half-width of the 95% confidence interval of the mean is
+                   at most this fraction of the mean. None takes all samples.
+    """
+    if tolerance is None:
+        return scorer.evaluate({}, max_samples, n_jobs=n_jobs)
+    num_runs = min(MIN_BASELINE_SAMPLES, max_samples)
+    while True:
+        result = scorer.evaluate({}, num_runs, n_jobs=n_jobs)
+        if num_runs >= max_samples or _is_precise(result, tolerance):
+            return result
+        num_runs = min(num_runs + max(BASELINE_BATCH_SIZE, n_jobs), max_samples)
+
 
 class OptunaCpSatStrategy:
     """
@@ -27,37 +78,131 @@ class OptunaCpSatStrategy:
         scorer: CachingScorer,
         n_samples_for_trial: int = 10,
         n_samples_for_verification: int = 30,
+        n_jobs: int = 1,
+        baseline_tolerance: float | None = 0.05,
     ):
+        """
+        Args:
+            parameter_space: The parameters to sample from.
+            scorer: The scorer that runs and caches the solves.
+            n_samples_for_trial: The number of runs for every trial.
+            n_samples_for_verification: The number of runs for the baseline and for trials
+                                        that improve on the best result so far.
+            n_jobs: The number of runs of a single evaluation to execute in parallel
+                    threads. With parallel trials in Optuna, the number of parallel solves
+                    is the product of both.
+            baseline_tolerance: Stop sampling the baseline once the half-width of the 95%
+                                confidence interval of its mean is at most this fraction of
+                                the mean, see `evaluate_baseline`. None takes all samples.
+        """
         self.parameter_space = parameter_space
         self.n_samples_for_trial = n_samples_for_trial
         self.n_samples_for_verification = n_samples_for_verification
         self.scorer = scorer
+        self.n_jobs = n_jobs
+        self.baseline_tolerance = baseline_tolerance
         self.direction = scorer.metric.direction
         self.metric = scorer.metric
+        self._baseline: MultiResult | None = None
+        self._baseline_knockout: tuple[int, float] | None = None
 
     def get_baseline(self) -> MultiResult:
         """
         Compute the baseline by solving the model with the default parameters.
+        The result is kept, such that the trials do not have to look it up again.
+        It is the same object as in the cache, so it sees later runs as well.
         """
-        return self.scorer.evaluate({}, self.n_samples_for_verification)
+        if self._baseline is None:
+            self._baseline = evaluate_baseline(
+                self.scorer,
+                self.n_samples_for_verification,
+                n_jobs=self.n_jobs,
+                tolerance=self.baseline_tolerance,
+            )
+        return self._baseline
+
+    def clear_cache(self) -> None:
+        """
+        Forgets all scores of the scorer, together with the baseline and its knockout
+        score, which would otherwise still refer to the old runs.
+        """
+        self.scorer.clear_cache()
+        self._baseline = None
+        self._baseline_knockout = None
+
+    def _knockout_score(self, result: MultiResult) -> float:
+        """
+        Returns a score that is clearly worse than all runs of the given result.
+        """
+        low, high = result.min(), result.max()
+        if self.direction == "minimize":
+            return high + 0.1 * (high - low)
+        else:
+            assert self.direction == "maximize"
+            return low - 0.1 * (high - low)
+
+    def _baseline_knockout_score(self) -> float:
+        """
+        The knockout score of the baseline only changes if the baseline gets more runs,
+        so it is kept together with the number of runs it was computed for.
+        """
+        baseline = self.get_baseline()
+        cached = self._baseline_knockout
+        if cached is None or cached[0] != len(baseline):
+            cached = (len(baseline), self._knockout_score(baseline))
+            self._baseline_knockout = cached
+        return cached[1]
+
+    def _incumbent(self) -> MultiResult:
+        """
+        Returns the best result with at least `n_samples_for_trial` runs. Results with fewer
+        runs were knocked out or are still being evaluated, and a single lucky run must not
+        become the reference for the knockouts. Without any such result, the baseline is used.
+        """
+        candidates = [
+            result for result in self.scorer if len(result) >= self.n_samples_for_trial
+        ]
+        if not candidates:
+            return self.get_baseline()
+        return self.metric.best(candidates, key=lambda x: x.mean())
+
+    def _report(self, trial: optuna.Trial, result: MultiResult) -> None:
+        """
+        Reports the running mean after every sample to the pruner of the study, such that
+        trials with clearly bad parameters can be stopped before all samples are taken.
+        """
+        trial.report(result.mean(), step=len(result))
+        # Pruning after the last sample would not save any solves.
+        if len(result) < self.n_samples_for_trial and trial.should_prune():
+            logger.info("Pruning trial %d after %d samples.", trial.number, len(result))
+            raise optuna.TrialPruned()
 
     def __call__(self, trial: optuna.Trial) -> float:
         """
         This function is called by Optuna to evaluate a trial.
         """
         sampled_params = self.parameter_space.sample(trial)
+        num_cached_runs = self.scorer.num_cached_runs(sampled_params)
+        if num_cached_runs >= self.n_samples_for_verification:
+            # The sampler proposed a configuration that is already fully evaluated, so
+            # there is no need to look up the incumbent and the knockout scores.
+            return self.scorer.evaluate(sampled_params).mean()
         baseline = self.get_baseline()
-        if self.direction == "minimize":
-            knockout_score = baseline.max() + 0.1 * (baseline.spread())
-        else:
-            assert self.direction == "maximize"
-            knockout_score = baseline.min() - 0.1 * (baseline.spread())
+        # The incumbent is at least as good as the baseline on average, so its
+        # knockout score is usually the tighter one.
+        incumbent = self._incumbent()
+        knockout_score = self.metric.best(
+            [self._baseline_knockout_score(), self._knockout_score(incumbent)]
+        )
         score = self.scorer.evaluate(
             sampled_params,
             num_runs=self.n_samples_for_trial,
             knockout_score=knockout_score,
+            n_jobs=self.n_jobs,
+            on_run=lambda result: self._report(trial, result),
+            knockout_reference=baseline,
         )
-        current_best = self.metric.best(self.scorer, key=lambda x: x.mean())
+        current_best = self._incumbent()
         if self.metric.comp(score.mean(), current_best.mean()) in (
             Comparison.BETTER,
             Comparison.EQUAL,
@@ -69,6 +214,8 @@ class OptunaCpSatStrategy:
                 sampled_params,
                 num_runs=self.n_samples_for_verification,
                 knockout_score=knockout_score,
+                n_jobs=self.n_jobs,
+                knockout_reference=baseline,
             )
         return score.mean()
 
@@ -78,4 +225,4 @@ class OptunaCpSatStrategy:
         function as it not only converts the parameters to the actual CP-SAT parameters, but can also give
         more information about the significance of the results.
         """
-        return self.metric.best(self.scorer, key=lambda x: x.mean())
+        return self._incumbent()
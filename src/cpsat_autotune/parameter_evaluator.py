@@ -1,20 +1,27 @@
 import logging
-from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Dict, Iterable, Union
-from .caching_solver import CachingScorer, MultiResult
+from .caching_solver import CachingScorer, MultiResult, is_significantly_better
 from .metrics import Comparison, Metric
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,  # Set the log level to INFO (can be adjusted to DEBUG for more verbosity)
-    format="%(asctime)s - %(levelname)s - %(message)s",  # Log format
-    handlers=[
-        logging.StreamHandler()  # StreamHandler logs to console, add more handlers as needed
-    ],
-)
 logger = logging.getLogger(__name__)
 
+# The minimal number of runs of a variant before a statistical test can stop it early.
+MIN_RUNS_FOR_DECISION = 3
+
+
+def _compute_contributions(diffs: Dict[str, float]) -> Dict[str, float]:
+    """
+    Returns the share of each parameter in the summed score differences. Without any
+    difference, e.g., for metrics that hit their limit, nothing contributes, and the
+    division would fail.
+    """
+    total_diff = sum(diffs.values())
+    return {
+        key: diff / total_diff if total_diff > 0 else 0.0 for key, diff in diffs.items()
+    }
+
 
 @dataclass
 class EvaluationResult:
@@ -41,13 +48,14 @@ class ParameterEvaluator:
         metric: Metric,
         n_samples_for_verification: int,
         n_samples_for_trial: int,
+        n_jobs: int = 1,
     ) -> None:
         self.params = params
         self.scorer = scorer
         self.metric = metric
-        self.results = defaultdict(list)
         self.n_samples_for_verification = n_samples_for_verification
         self.n_samples_for_trial = n_samples_for_trial
+        self.n_jobs = n_jobs
         logger.info("ParameterEvaluator initialized with params: %s", params)
 
     def _generate_variants(
@@ -60,15 +68,76 @@ class ParameterEvaluator:
             reduced_params = {k: v for k, v in params.items() if k != key}
             yield key, reduced_params
 
-    def _evaluate_single_parameter(self, key: str, params: dict) -> float:
+    def _is_decided(
+        self, result: MultiResult, threshold: float, alpha: float = 0.05
+    ) -> bool:
+        """
+        Checks with a one-sample t-test whether the mean score is significantly different
+        from the threshold, such that more runs would not change which side it is on.
+        """
+        if len(result) < MIN_RUNS_FOR_DECISION:
+            return False
+        if result.spread() == 0:
+            # The test is undefined without variation.
+            return result.mean() != threshold
+        from scipy import stats
+
+        return stats.ttest_1samp(result.scores, threshold).pvalue < alpha
+
+    def _evaluate_single_parameter(
+        self,
+        key: str,
+        params: dict,
+        n_jobs: int = 1,
+        accept_as_equal: float | None = None,
+    ) -> float:
         """
         Evaluates the impact of excluding a single parameter on the model's performance.
+        If `accept_as_equal` is given, the evaluation stops as soon as the mean score is
+        significantly better or worse than it.
         """
         logger.info("Evaluating resetting parameter '%s' to default...", key)
-        score = self.scorer.evaluate(params, num_runs=self.n_samples_for_trial)
+        score = self.scorer.evaluate(
+            params,
+            num_runs=self.n_samples_for_trial,
+            n_jobs=n_jobs,
+            stop_early=(
+                (lambda result: self._is_decided(result, accept_as_equal))
+                if accept_as_equal is not None
+                else None
+            ),
+        )
         logger.debug("Score for parameter '%s': %s", key, score.mean())
         return score.mean()
 
+    def _evaluate_variants(self, accept_as_equal: float) -> list[tuple[str, float]]:
+        """
+        Evaluates all variants with a single parameter reset. The variants are independent,
+        so with multiple jobs they are evaluated in parallel threads. This balances the load
+        better than parallelizing the runs of each variant, which would wait for the slowest
+        run of every variant.
+        """
+        variants = list(self._generate_variants(self.params))
+        if self.n_jobs <= 1 or len(variants) <= 1:
+            return [
+                (
+                    key,
+                    self._evaluate_single_parameter(
+                        key, params, self.n_jobs, accept_as_equal
+                    ),
+                )
+                for key, params in variants
+            ]
+        n_threads = min(self.n_jobs, len(variants))
+        with ThreadPoolExecutor(max_workers=n_threads) as executor:
+            scores = executor.map(
+                lambda variant: self._evaluate_single_parameter(
+                    *variant, accept_as_equal=accept_as_equal
+                ),
+                variants,
+            )
+            return [(key, score) for (key, _), score in zip(variants, scores)]
+
     def evaluate(self) -> EvaluationResult:
         """
         Evaluates the impact of excluding each parameter individually, identifies
@@ -77,29 +146,24 @@ class ParameterEvaluator:
         """
         logger.info("Starting evaluation of parameter importance...")
         default_baseline = self.scorer.evaluate(
-            {}, num_runs=self.n_samples_for_verification
+            {}, num_runs=self.n_samples_for_verification, n_jobs=self.n_jobs
         )
         optuna_baseline = self.scorer.evaluate(
-            self.params, num_runs=self.n_samples_for_verification
+            self.params, num_runs=self.n_samples_for_verification, n_jobs=self.n_jobs
         )
-        if self.metric.comp(default_baseline.mean(), optuna_baseline.mean()) in (
-            Comparison.BETTER,
-            Comparison.EQUAL,
-        ):
+        if not is_significantly_better(self.metric, optuna_baseline, default_baseline):
             logger.warning(
-                "After increasing the number of samples, no advantage was found in the optimized parameters. Discarding the results."
+                "After increasing the number of samples, no significant advantage was found in the optimized parameters. Discarding the results."
             )
             return EvaluationResult(
                 optimized_params={}, contribution={}, optimized_score=default_baseline
             )
-        accept_as_equal = (
-            self.metric.worst(optuna_baseline) + optuna_baseline.mean()
-        ) / 2
+        optuna_mean = optuna_baseline.mean()
+        accept_as_equal = (self.metric.worst(optuna_baseline) + optuna_mean) / 2
         optimized_params = {}
         diffs = {}
 
-        for key, params in self._generate_variants(self.params):
-            score_wo_key = self._evaluate_single_parameter(key, params)
+        for key, score_wo_key in self._evaluate_variants(accept_as_equal):
             if self.metric.comp(score_wo_key, accept_as_equal) in (
                 Comparison.EQUAL,
                 Comparison.BETTER,
@@ -111,16 +175,20 @@ class ParameterEvaluator:
             else:
                 logger.info("Parameter '%s' is essential for performance.", key)
                 optimized_params[key] = self.params[key]
-                diffs[key] = abs(optuna_baseline.mean() - score_wo_key)
+                diffs[key] = abs(optuna_mean - score_wo_key)
 
-        # Calculate parameter significance
-        total_diff = sum(diffs.values())
-        significance = {key: diff / total_diff for key, diff in diffs.items()}
+        significance = _compute_contributions(diffs)
 
         # Final evaluation with optimized parameters
-        optimized_score = self.scorer.evaluate(
-            optimized_params, num_runs=self.n_samples_for_verification
-        )
+        if optimized_params == self.params:
+            # No parameter was dropped, so the tuned parameters are already verified.
+            optimized_score = optuna_baseline
+        else:
+            optimized_score = self.scorer.evaluate(
+                optimized_params,
+                num_runs=self.n_samples_for_verification,
+                n_jobs=self.n_jobs,
+            )
         logger.debug("Optimized score: %s", optimized_score)
 
         if (
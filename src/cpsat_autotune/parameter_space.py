@@ -1,8 +1,12 @@
 import logging
+import math
 from typing import Iterable
 from ortools.sat.python import cp_model
 import optuna
 from .cpsat_parameters import CPSAT_PARAMETERS
+from .parameters import BoolParameter
+
+logger = logging.getLogger(__name__)
 
 
 class CpSatParameterSpace:
@@ -15,12 +19,31 @@ class CpSatParameterSpace:
 
     def __init__(self):
         self.tunable_parameters = {param.name: param for param in CPSAT_PARAMETERS}
+        self._samplers = None
 
     def drop_parameter(self, parameter: str):
         """
         Will remove a parameter from the parameter space.
         """
         self.tunable_parameters.pop(parameter, None)
+        self._samplers = None
+
+    def _get_samplers(self) -> tuple:
+        """
+        Returns a tuple of (name, sample function, default) for all tunable parameters.
+        It is only rebuilt if the parameter space changes, such that the trials do not
+        have to look up the defaults again. The defaults of list parameters are frozensets,
+        as the order of their values does not matter.
+        """
+        if self._samplers is None:
+            samplers = []
+            for parameter in self.tunable_parameters.values():
+                default = parameter.get_cpsat_default()
+                if isinstance(default, (list, tuple)):
+                    default = frozenset(default)
+                samplers.append((parameter.name, parameter.sample, default))
+            self._samplers = tuple(samplers)
+        return self._samplers
 
     def filter_applicable_parameters(self, models: Iterable[cp_model.CpModel]):
         """
@@ -35,7 +58,7 @@ class CpSatParameterSpace:
         params = list(self.tunable_parameters.values())
         for param in params:
             if not any(param.is_effective_for(model) for model in models):
-                logging.info(
+                logger.info(
                     "Dropping parameter `%s` as it is not effective for any of the provided models.",
                     param.name,
                 )
@@ -54,14 +77,13 @@ class CpSatParameterSpace:
             trial = optuna.trial.FixedTrial(trial)
         assert isinstance(trial, (optuna.Trial, optuna.trial.FixedTrial))
         params = {}
-        for parameter in self.tunable_parameters.values():
-            value = parameter.sample(trial)
-            default = parameter.get_cpsat_default()
-            if isinstance(value, (list, tuple)):
-                if set(default) != set(value):
-                    params[parameter.name] = list(value)
+        for name, sample, default in self._get_samplers():
+            value = sample(trial)
+            if isinstance(default, frozenset):
+                if default != frozenset(value):
+                    params[name] = list(value)
             elif value != default:
-                params[parameter.name] = value
+                params[name] = value
         return params
 
     def get_default_params_for_optuna(self):
@@ -73,6 +95,57 @@ class CpSatParameterSpace:
             default_params.update(param.get_optuna_default())
         return default_params
 
+    def get_bool_flip_params_for_optuna(self) -> list[dict]:
+        """
+        Returns one configuration for Optuna per boolean parameter, in which only this parameter
+        differs from the default. Most boolean parameters are off by default, such that a
+        uniform prior would flip each of them in half of the samples. Evaluating the single
+        flips first lets the sampler learn early which of them are worth exploring.
+        """
+        default_params = self.get_default_params_for_optuna()
+        return [
+            {**default_params, param.name: not param.get_cpsat_default()}
+            for param in self.tunable_parameters.values()
+            if isinstance(param, BoolParameter)
+        ]
+
+    def num_optuna_dimensions(self) -> int:
+        """
+        Returns the number of Optuna parameters the parameter space is mapped to.
+        """
+        return sum(
+            param.num_optuna_dimensions() for param in self.tunable_parameters.values()
+        )
+
+    def get_sobol_params_for_optuna(self, n: int) -> list[dict]:
+        """
+        Returns `n` parameter configurations for Optuna that cover the parameter space evenly.
+        They are obtained from a scrambled Sobol sequence, which has a much lower discrepancy
+        than uniform random samples and thus gives a better initial design for the sampler.
+        """
+        if n <= 0:
+            return []
+        from scipy.stats import qmc  # Imported lazily, as it is slow to import.
+
+        parameters = list(self.tunable_parameters.values())
+        dimensions = [param.num_optuna_dimensions() for param in parameters]
+        sobol = qmc.Sobol(d=sum(dimensions), scramble=True)
+        # Sobol sequences are only balanced for powers of two.
+        points = sobol.random_base2(math.ceil(math.log2(n)))[:n]
+        configurations = []
+        for point in points:
+            configuration = {}
+            offset = 0
+            for param, dimension in zip(parameters, dimensions):
+                configuration.update(
+                    param.get_optuna_params_from_unit_cube(
+                        point[offset : offset + dimension]
+                    )
+                )
+                offset += dimension
+            configurations.append(configuration)
+        return configurations
+
     def get_cpsat_params_from_trial(self, trial: optuna.trial.FixedTrial) -> dict:
         """
         Returns the parameters for CP-SAT from an Optuna trial. The values are not the Optuna values, but the CP-SAT values.
@@ -6,10 +6,17 @@ It also provides more types of parameters than Optuna does out of the box, such
 
 from abc import ABC, abstractmethod
 from ortools.sat.python import cp_model
-from typing import Callable
+from typing import Callable, Sequence
 import optuna
 
 
+def _select_from_unit(u: float, values: Sequence):
+    """
+    Selects the value of the bin the value `u` from [0, 1) falls into.
+    """
+    return values[min(int(u * len(values)), len(values) - 1)]
+
+
 def _for_all_models(model: cp_model.CpModel) -> bool:
     """
     Default filter function that returns True for all models.
@@ -100,6 +107,26 @@ class CpSatParameter(ABC):
         """
         return {self.name: cpsat_params[self.name]}
 
+    def num_optuna_dimensions(self) -> int:
+        """
+        Returns the number of Optuna parameters this parameter is mapped to.
+        """
+        return 1
+
+    @abstractmethod
+    def get_optuna_params_from_unit_cube(self, point: Sequence[float]) -> dict:
+        """
+        Maps a point of the unit cube to Optuna parameter values. This allows to create
+        an initial design, e.g., with a Sobol sequence, that covers the parameter space evenly.
+
+        Args:
+            point: A sequence of `num_optuna_dimensions()` values in [0, 1).
+
+        Returns:
+            A dictionary of parameter values formatted for Optuna.
+        """
+        pass
+
     def is_effective_for(self, model: cp_model.CpModel) -> bool:
         """
         Returns true if the parameter could have an effect on solving the model.
@@ -154,6 +181,9 @@ class BoolParameter(CpSatParameter):
         """
         return trial.suggest_categorical(self.name, [True, False])
 
+    def get_optuna_params_from_unit_cube(self, point: Sequence[float]) -> dict:
+        return {self.name: _select_from_unit(point[0], [True, False])}
+
 
 class CategoryParameter(CpSatParameter):
     """
@@ -201,6 +231,9 @@ class CategoryParameter(CpSatParameter):
         """
         return trial.suggest_categorical(self.name, self.values)
 
+    def get_optuna_params_from_unit_cube(self, point: Sequence[float]) -> dict:
+        return {self.name: _select_from_unit(point[0], self.values)}
+
 
 class IntParameter(CpSatParameter):
     """
@@ -253,6 +286,17 @@ class IntParameter(CpSatParameter):
             self.name, low=self.lower_bound, high=self.upper_bound, log=self.log
         )
 
+    def get_optuna_params_from_unit_cube(self, point: Sequence[float]) -> dict:
+        if self.log:
+            # Interpolate on the logarithmic scale, as Optuna would sample it.
+            ratio = (self.upper_bound + 1) / self.lower_bound
+            value = int(self.lower_bound * ratio ** point[0])
+        else:
+            value = self.lower_bound + int(
+                point[0] * (self.upper_bound - self.lower_bound + 1)
+            )
+        return {self.name: min(value, self.upper_bound)}
+
 
 class ListParameter(CpSatParameter):
     """
@@ -285,6 +329,9 @@ class ListParameter(CpSatParameter):
             subsolver=subsolver,
         )
         self.values = values
+        # The names of the binary Optuna parameters in the sorted order of the values,
+        # such that they do not have to be formatted and sorted again for every trial.
+        self._optuna_names = [(value, f"{name}:{value}") for value in sorted(values)]
 
     def sample(self, trial: optuna.Trial) -> list:
         """
@@ -297,12 +344,20 @@ class ListParameter(CpSatParameter):
             A list of values representing a subset of the possible values.
         """
         sampled_list = []
-        for value in self.values:
-            select = trial.suggest_categorical(f"{self.name}:{value}", [True, False])
-            if select:
+        for value, optuna_name in self._optuna_names:
+            if trial.suggest_categorical(optuna_name, [True, False]):
                 sampled_list.append(value)
         return sampled_list
 
+    def num_optuna_dimensions(self) -> int:
+        return len(self.values)
+
+    def get_optuna_params_from_unit_cube(self, point: Sequence[float]) -> dict:
+        return {
+            optuna_name: _select_from_unit(u, [True, False])
+            for (_, optuna_name), u in zip(self._optuna_names, point)
+        }
+
     def get_optuna_default(self) -> dict:
         """
         Retrieve the default value formatted for Optuna as a dictionary of binary selections.
@@ -311,8 +366,8 @@ class ListParameter(CpSatParameter):
             A dictionary representing the default selection of values in Optuna's format.
         """
         return {
-            f"{self.name}:{value}": value in self._default_value
-            for value in self.values
+            optuna_name: value in self._default_value
+            for value, optuna_name in self._optuna_names
         }
 
     def get_cpsat_params(self, optuna_params: dict) -> dict:
@@ -327,11 +382,9 @@ class ListParameter(CpSatParameter):
         """
         return {
             self.name: tuple(
-                sorted(
-                    value
-                    for value in self.values
-                    if optuna_params[f"{self.name}:{value}"]
-                )
+                value
+                for value, optuna_name in self._optuna_names
+                if optuna_params[optuna_name]
             )
         }
 
@@ -345,9 +398,9 @@ class ListParameter(CpSatParameter):
         Returns:
             A dictionary representing the selected subset of values in Optuna's format.
         """
+        selected = set(cpsat_params[self.name])
         return {
-            f"{self.name}:{value}": value in cpsat_params[self.name]
-            for value in self.values
+            optuna_name: value in selected for value, optuna_name in self._optuna_names
         }
 
 
@@ -400,6 +453,9 @@ class IntFromOrderedListParameter(CpSatParameter):
             trial.suggest_int(self.name, low=0, high=len(self.values) - 1)
         ]
 
+    def get_optuna_params_from_unit_cube(self, point: Sequence[float]) -> dict:
+        return {self.name: _select_from_unit(point[0], range(len(self.values)))}
+
     def get_optuna_default(self) -> dict:
         """
         Retrieve the default index formatted for Optuna.
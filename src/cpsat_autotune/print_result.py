@@ -36,8 +36,9 @@ def print_results(
         descriptions = []
 
         for i, (key, value) in enumerate(result.optimized_params.items(), start=1):
-            default_value = get_parameter_by_name(key).get_cpsat_default()
-            description = get_parameter_by_name(key).description.strip()
+            parameter = get_parameter_by_name(key)
+            default_value = parameter.get_cpsat_default()
+            description = parameter.description.strip()
             contribution_value = (
                 f"{result.contribution.get(key, '<NA>'):.2%}"
                 if key in result.contribution
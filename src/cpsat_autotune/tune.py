@@ -1,9 +1,10 @@
 import logging
+import os
 import optuna
 from ortools.sat.python import cp_model
 from .print_result import print_results
 from .caching_solver import CachingScorer, MultiResult
-from .objective import OptunaCpSatStrategy
+from .objective import OptunaCpSatStrategy, evaluate_baseline
 from .metrics import (
     Metric,
     MinObjective,
@@ -14,14 +15,121 @@ from .metrics import (
 from .parameter_space import CpSatParameterSpace
 from .parameter_evaluator import ParameterEvaluator
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[logging.StreamHandler()],
-)
 logger = logging.getLogger(__name__)
 
+STUDY_NAME = "cpsat-autotune"
+MIN_SOBOL_TRIALS = 16
+
+
+def _create_storage(journal_file: str | None) -> optuna.storages.BaseStorage | None:
+    """
+    Creates the storage for the Optuna study. Without a journal file, the study is kept in memory.
+    The journal storage only appends to a log file, which is cheaper than a database and can
+    be shared by multiple processes.
+    """
+    if journal_file is None:
+        return None
+    return optuna.storages.JournalStorage(
+        optuna.storages.journal.JournalFileBackend(journal_file)
+    )
+
+
+def _create_sampler(
+    sampler: str | optuna.samplers.BaseSampler, n_startup_trials: int, n_jobs: int
+) -> optuna.samplers.BaseSampler:
+    """
+    Creates the sampler for the Optuna study. Besides the names "tpe" and "random",
+    any Optuna sampler can be passed, e.g., a random forest based sampler from OptunaHub.
+    """
+    if isinstance(sampler, optuna.samplers.BaseSampler):
+        return sampler
+    if sampler == "tpe":
+        # The multivariate TPE can exploit correlations between parameters, e.g., between
+        # `linearization_level` and `cut_level`. The constant liar prevents parallel workers
+        # from sampling the same parameters.
+        return optuna.samplers.TPESampler(
+            n_startup_trials=n_startup_trials,
+            multivariate=True,
+            constant_liar=n_jobs > 1,
+        )
+    if sampler == "random":
+        return optuna.samplers.RandomSampler()
+    raise ValueError(f"Unknown sampler '{sampler}'. Use 'tpe', 'random', or a sampler.")
+
+
+def _create_study(
+    direction: str,
+    sampler: optuna.samplers.BaseSampler,
+    pruner: optuna.pruners.BasePruner,
+    storage: optuna.storages.BaseStorage | None,
+    initial_trials: list[dict],
+    setup: dict[str, str] | None = None,
+) -> optuna.Study:
+    """
+    Creates the study and enqueues the initial trials, or continues the study if it already
+    exists in the storage. Creating a study is atomic in the storage, so if several processes
+    start at the same time, only the one that actually creates the study enqueues the trials.
+
+    The `setup`, e.g., the metric and the namespace of the model, is stored in the user
+    attributes of the study. An existing study is only continued with the same setup,
+    as its trial values would not be comparable otherwise.
+    """
+    setup = {"direction": direction, **(setup or {})}
+    try:
+        study = optuna.create_study(
+            direction=direction,
+            sampler=sampler,
+            pruner=pruner,
+            storage=storage,
+            study_name=STUDY_NAME,
+        )
+    except optuna.exceptions.DuplicatedStudyError:
+        study = optuna.load_study(
+            study_name=STUDY_NAME, storage=storage, sampler=sampler, pruner=pruner
+        )
+        # A process that just created the study may not have stored the setup yet.
+        stored_setup = {
+            key: study.user_attrs.get(key, value) for key, value in setup.items()
+        }
+        if stored_setup != setup:
+            raise ValueError(
+                f"The existing study '{STUDY_NAME}' was created for {stored_setup}, "
+                f"but the current setup is {setup}. Use a different journal file."
+            )
+        logger.info("Continuing the existing study '%s'.", STUDY_NAME)
+        return study
+    for key, value in setup.items():
+        study.set_user_attr(key, value)
+    for params in initial_trials:
+        study.enqueue_trial(params)
+    return study
+
+
+class _NoImprovementStopper:
+    """
+    Optuna callback that stops the study if the best trial has not changed
+    for a given number of trials. The trials of the initial design are not counted,
+    as the design should be completed before the sampler takes over.
+    """
+
+    def __init__(self, patience: int, n_initial_trials: int = 0):
+        self.patience = patience
+        self.n_initial_trials = n_initial_trials
+
+    def __call__(self, study: optuna.Study, trial: optuna.trial.FrozenTrial) -> None:
+        try:
+            best_trial_number = study.best_trial.number
+        except ValueError:  # No trial has been completed yet
+            return
+        # The trial numbers start at zero, so this is the number of the last design trial.
+        last_initial_trial = self.n_initial_trials - 1
+        if trial.number - max(best_trial_number, last_initial_trial) >= self.patience:
+            logger.info(
+                "No improvement in the last %s trials. Stopping the optimization.",
+                self.patience,
+            )
+            study.stop()
+
 
 def _tune(
     parameter_space: CpSatParameterSpace,
@@ -30,6 +138,16 @@ def _tune(
     n_samples_for_verification: int,
     n_samples_for_trial: int,
     n_trials: int = 100,
+    n_jobs: int = 1,
+    n_jobs_per_trial: int = 1,
+    fixed_params: dict | None = None,
+    journal_file: str | None = None,
+    timeout: float | None = None,
+    patience: int | None = None,
+    cache_file: str | None = None,
+    clear_cache: bool = False,
+    pruner: optuna.pruners.BasePruner | None = None,
+    sampler: str | optuna.samplers.BaseSampler = "tpe",
 ) -> MultiResult:
     """
     Perform hyperparameter tuning using Optuna.
@@ -41,15 +159,40 @@ def _tune(
         n_samples_for_verification (int): The number of samples to use when verifying parameters.
         n_samples_for_trial (int): The number of samples to use for each trial.
         n_trials (int): The number of trials to execute in the tuning process. Defaults to 100.
+        n_jobs (int): The number of trials to run in parallel. CP-SAT releases the GIL while solving,
+                      so the trials are simply run in threads sharing the same cache. Defaults to 1.
+        n_jobs_per_trial (int): The number of runs of a single trial to execute in parallel threads.
+                                A trial that is knocked out cancels its remaining runs. Defaults to 1.
+        fixed_params (dict | None): Parameters that are set for every solve but not tuned.
+        journal_file (str | None): Store the Optuna study in this journal file instead of in memory.
+                                   An existing study in the file is continued if it was created
+                                   for the same model, metric, and fixed parameters.
+        timeout (float | None): Stop the optimization after this many seconds.
+        patience (int | None): Stop the optimization if the best trial did not change for this many trials.
+                               The trials of the initial design are not counted.
+        cache_file (str | None): Persist the scores of all runs in this SQLite file and reuse them.
+        clear_cache (bool): Discard the scores stored for this model and metric in the cache file first.
+        pruner (optuna.pruners.BasePruner | None): Prune trials based on the running mean of their samples.
+        sampler (str | optuna.samplers.BaseSampler): "tpe", "random", or an Optuna sampler. Defaults to "tpe".
 
     Returns:
         MultiResult: The best parameters found during the tuning process.
     """
     logger.info("Starting hyperparameter tuning with %s trials.", n_trials)
-    scorer = CachingScorer(model, metric)
+    scorer = CachingScorer(
+        model, metric, fixed_params=fixed_params, cache_file=cache_file
+    )
+    if clear_cache:
+        logger.info("Clearing the cached scores.")
+        scorer.clear_cache()
 
     # Evaluate baseline performance using default parameters
-    default_baseline = scorer.evaluate({}, n_samples_for_verification)
+    # The baseline runs are independent, so they can use all parallel threads at once.
+    # The strategy below computes the baseline the same way and finds it in the cache.
+    n_parallel_solves = n_jobs * n_jobs_per_trial
+    default_baseline = evaluate_baseline(
+        scorer, n_samples_for_verification, n_parallel_solves
+    )
     logger.info(
         "Baseline evaluation completed: min=%s, mean=%s, max=%s",
         default_baseline.min(),
@@ -63,19 +206,43 @@ def _tune(
         scorer=scorer,
         n_samples_for_trial=n_samples_for_trial,
         n_samples_for_verification=n_samples_for_verification,
+        n_jobs=n_jobs_per_trial,
     )
 
-    # Initialize the study with the default parameters
+    # Initialize the study with the default parameters, the single flips of the boolean
+    # parameters, and a Sobol design, which covers the parameter space more evenly than
+    # the random startup trials of TPE. Each part takes at most a quarter of the trials.
     default_params = parameter_space.get_default_params_for_optuna()
-    study = optuna.create_study(
+    initial_design = parameter_space.get_bool_flip_params_for_optuna()[: n_trials // 4]
+    # A good covering needs about two points per dimension, but the budget is respected.
+    n_sobol = max(2 * parameter_space.num_optuna_dimensions(), MIN_SOBOL_TRIALS)
+    initial_design += parameter_space.get_sobol_params_for_optuna(
+        min(n_sobol, n_trials // 4)
+    )
+    study = _create_study(
         direction=objective.scorer.metric.direction,
-        sampler=optuna.samplers.TPESampler(),
+        sampler=_create_sampler(sampler, len(initial_design) + 1, n_jobs),
+        # Without an explicit pruner, Optuna would fall back to the `MedianPruner`.
+        pruner=pruner if pruner is not None else optuna.pruners.NopPruner(),
+        storage=_create_storage(journal_file),
+        initial_trials=[default_params] + initial_design,
+        setup={"metric": type(metric).__name__, "namespace": scorer.namespace},
     )
-    study.enqueue_trial(default_params)
 
     # Optimize the study with the defined objective function
     logger.info("Starting Optuna optimization.")
-    study.optimize(objective, n_trials=n_trials)
+    callbacks = (
+        [_NoImprovementStopper(patience, n_initial_trials=len(initial_design) + 1)]
+        if patience is not None
+        else []
+    )
+    study.optimize(
+        objective,
+        n_trials=n_trials,
+        n_jobs=n_jobs,
+        timeout=timeout,
+        callbacks=callbacks,
+    )
 
     # Retrieve and log the best parameters
     best_params = objective.best_params()
@@ -90,6 +257,7 @@ def _tune(
         metric=metric,
         n_samples_for_verification=n_samples_for_verification,
         n_samples_for_trial=n_samples_for_trial,
+        n_jobs=n_parallel_solves,
     )
     result = evaluator.evaluate()
     print_results(result, default_score=default_baseline, metric=metric)
@@ -98,6 +266,27 @@ def _tune(
     return best_params
 
 
+def _fix_num_workers(
+    parameter_space: CpSatParameterSpace, num_workers: int | None, n_jobs: int = 1
+) -> dict:
+    """
+    Removes `num_workers` from the parameter space if the user wants to fix it,
+    and returns the corresponding fixed parameters for the scorer. If multiple jobs
+    run in parallel and no number of workers is given, the available cores are split
+    among the jobs, as each solve would otherwise try to use all of them. `n_jobs` is the
+    total number of parallel solves, i.e., the parallel trials times the parallel runs per trial.
+    """
+    if num_workers is None and n_jobs > 1:
+        num_workers = max(1, (os.cpu_count() or 1) // n_jobs)
+        logger.info(
+            "Running %d solves in parallel with %d workers each.", n_jobs, num_workers
+        )
+    if num_workers is None:
+        return {}
+    parameter_space.drop_parameter("num_workers")
+    return {"num_workers": num_workers}
+
+
 def tune_time_to_optimal(
     model: cp_model.CpModel,
     max_time_in_seconds: float,
@@ -105,6 +294,16 @@ def tune_time_to_optimal(
     n_samples_for_trial: int = 10,
     n_samples_for_verification: int = 30,
     n_trials: int = 100,
+    n_jobs: int = 1,
+    n_jobs_per_trial: int = 1,
+    num_workers: int | None = None,
+    journal_file: str | None = None,
+    timeout: float | None = None,
+    patience: int | None = None,
+    cache_file: str | None = None,
+    clear_cache: bool = False,
+    pruner: optuna.pruners.BasePruner | None = None,
+    sampler: str | optuna.samplers.BaseSampler = "tpe",
 ) -> dict:
     """
     Tune CP-SAT hyperparameters to minimize the time required to find an optimal solution.
@@ -121,6 +320,39 @@ def tune_time_to_optimal(
         n_samples_for_trial (int): The number of samples to take in each trial. Defaults to 10.
         n_samples_for_verification (int): The number of samples for verifying parameters. Defaults to 30.
         n_trials (int): The number of trials to execute in the tuning process. Defaults to 100.
+        n_jobs (int): The number of trials to run in parallel. Note that CP-SAT itself already uses all
+                      available cores by default, so this is mostly useful in combination with a
+                      limited number of workers for CP-SAT. Defaults to 1.
+        n_jobs_per_trial (int): The number of runs of a single trial to execute in parallel. Unlike parallel
+                                trials, this keeps the sampler fully sequential, and a trial that is knocked
+                                out cancels its remaining runs. Defaults to 1.
+        num_workers (int | None): Fix the number of workers CP-SAT uses for each solve instead of tuning it.
+                                  If you run multiple solves in parallel, you should set this value such that
+                                  `n_jobs * n_jobs_per_trial * num_workers` does not exceed the number of
+                                  available cores.
+                                  Defaults to None, which will tune the number of workers, or, for multiple parallel solves,
+                                  split the available cores among the parallel jobs.
+        journal_file (str | None): Store the Optuna study in this journal file to inspect it later, e.g.,
+                                   with optuna-dashboard. An existing study in the file is continued.
+                                   Defaults to None, which keeps the study in memory.
+        timeout (float | None): Stop the tuning after this many seconds, even if not all trials have been
+                                executed. The final evaluation of the parameters is not included.
+                                Defaults to None, which does not limit the time.
+        patience (int | None): Stop the tuning early if the best trial did not change for this many trials
+                               after the initial design, i.e., the default parameters, the flipped boolean
+                               parameters, and the Sobol points. Defaults to None, which always executes all trials.
+        cache_file (str | None): Persist the scores of all solves in this SQLite file. Later tuning runs
+                                 on the same model with the same metric reuse them instead of solving again.
+                                 Defaults to None, which keeps the scores only in memory.
+        clear_cache (bool): Discard the scores stored in the cache file for this model and metric before
+                            tuning, e.g., after updating OR-Tools, which changes the runtimes. Defaults to False.
+        pruner (optuna.pruners.BasePruner | None): An Optuna pruner, e.g., `MedianPruner`, that stops trials
+                                                   early based on the running mean of their samples. The
+                                                   knockout of clearly bad trials is applied in any case.
+                                                   Defaults to None, which disables pruning.
+        sampler (str | optuna.samplers.BaseSampler): The sampler to explore the parameter space, either "tpe",
+                                                     "random", or any Optuna sampler, e.g., a random forest based
+                                                     one for the mostly categorical parameters. Defaults to "tpe".
 
     Returns:
         dict: The best parameters found during the tuning process.
@@ -131,6 +363,9 @@ def tune_time_to_optimal(
     parameter_space.drop_parameter("use_lns_only")  # Not useful for this metric
     parameter_space.drop_parameter("max_time_in_seconds")
     parameter_space.filter_applicable_parameters([model])
+    fixed_params = _fix_num_workers(
+        parameter_space, num_workers, n_jobs * n_jobs_per_trial
+    )
 
     if relative_gap_limit > 0.0:
         parameter_space.drop_parameter("relative_gap_tolerance")
@@ -146,6 +381,16 @@ def tune_time_to_optimal(
         n_samples_for_verification=n_samples_for_verification,
         n_samples_for_trial=n_samples_for_trial,
         n_trials=n_trials,
+        n_jobs=n_jobs,
+        n_jobs_per_trial=n_jobs_per_trial,
+        fixed_params=fixed_params,
+        journal_file=journal_file,
+        timeout=timeout,
+        patience=patience,
+        cache_file=cache_file,
+        clear_cache=clear_cache,
+        pruner=pruner,
+        sampler=sampler,
     ).params
 
     logger.info("Tuning for time to optimal completed.")
@@ -160,6 +405,16 @@ def tune_for_quality_within_timelimit(
     n_samples_for_trial: int = 10,
     n_samples_for_verification: int = 30,
     n_trials: int = 100,
+    n_jobs: int = 1,
+    n_jobs_per_trial: int = 1,
+    num_workers: int | None = None,
+    journal_file: str | None = None,
+    timeout: float | None = None,
+    patience: int | None = None,
+    cache_file: str | None = None,
+    clear_cache: bool = False,
+    pruner: optuna.pruners.BasePruner | None = None,
+    sampler: str | optuna.samplers.BaseSampler = "tpe",
 ) -> dict:
     """
     Tune CP-SAT hyperparameters to maximize or minimize solution quality within a given time limit.
@@ -177,6 +432,39 @@ def tune_for_quality_within_timelimit(
         n_samples_for_trial (int): The number of samples to take in each trial. Defaults to 10.
         n_samples_for_verification (int): The number of samples for verifying parameters. Defaults to 30.
         n_trials (int): The number of trials to execute in the tuning process. Defaults to 100.
+        n_jobs (int): The number of trials to run in parallel. Note that CP-SAT itself already uses all
+                      available cores by default, so this is mostly useful in combination with a
+                      limited number of workers for CP-SAT. Defaults to 1.
+        n_jobs_per_trial (int): The number of runs of a single trial to execute in parallel. Unlike parallel
+                                trials, this keeps the sampler fully sequential, and a trial that is knocked
+                                out cancels its remaining runs. Defaults to 1.
+        num_workers (int | None): Fix the number of workers CP-SAT uses for each solve instead of tuning it.
+                                  If you run multiple solves in parallel, you should set this value such that
+                                  `n_jobs * n_jobs_per_trial * num_workers` does not exceed the number of
+                                  available cores.
+                                  Defaults to None, which will tune the number of workers, or, for multiple parallel solves,
+                                  split the available cores among the parallel jobs.
+        journal_file (str | None): Store the Optuna study in this journal file to inspect it later, e.g.,
+                                   with optuna-dashboard. An existing study in the file is continued.
+                                   Defaults to None, which keeps the study in memory.
+        timeout (float | None): Stop the tuning after this many seconds, even if not all trials have been
+                                executed. The final evaluation of the parameters is not included.
+                                Defaults to None, which does not limit the time.
+        patience (int | None): Stop the tuning early if the best trial did not change for this many trials
+                               after the initial design, i.e., the default parameters, the flipped boolean
+                               parameters, and the Sobol points. Defaults to None, which always executes all trials.
+        cache_file (str | None): Persist the scores of all solves in this SQLite file. Later tuning runs
+                                 on the same model with the same metric reuse them instead of solving again.
+                                 Defaults to None, which keeps the scores only in memory.
+        clear_cache (bool): Discard the scores stored in the cache file for this model and metric before
+                            tuning, e.g., after updating OR-Tools, which changes the runtimes. Defaults to False.
+        pruner (optuna.pruners.BasePruner | None): An Optuna pruner, e.g., `MedianPruner`, that stops trials
+                                                   early based on the running mean of their samples. The
+                                                   knockout of clearly bad trials is applied in any case.
+                                                   Defaults to None, which disables pruning.
+        sampler (str | optuna.samplers.BaseSampler): The sampler to explore the parameter space, either "tpe",
+                                                     "random", or any Optuna sampler, e.g., a random forest based
+                                                     one for the mostly categorical parameters. Defaults to "tpe".
 
     Returns:
         dict: The best parameters found during the tuning process.
@@ -191,6 +479,9 @@ def tune_for_quality_within_timelimit(
     parameter_space = CpSatParameterSpace()
     parameter_space.drop_parameter("max_time_in_seconds")
     parameter_space.filter_applicable_parameters([model])
+    fixed_params = _fix_num_workers(
+        parameter_space, num_workers, n_jobs * n_jobs_per_trial
+    )
     if direction == "maximize":
         metric = MaxObjective(
             obj_for_timeout=obj_for_timeout, max_time_in_seconds=max_time_in_seconds
@@ -214,6 +505,16 @@ def tune_for_quality_within_timelimit(
         n_samples_for_verification=n_samples_for_verification,
         n_samples_for_trial=n_samples_for_trial,
         n_trials=n_trials,
+        n_jobs=n_jobs,
+        n_jobs_per_trial=n_jobs_per_trial,
+        fixed_params=fixed_params,
+        journal_file=journal_file,
+        timeout=timeout,
+        patience=patience,
+        cache_file=cache_file,
+        clear_cache=clear_cache,
+        pruner=pruner,
+        sampler=sampler,
     ).params
 
     logger.info("Tuning for quality within time limit completed.")
@@ -227,6 +528,16 @@ def tune_for_gap_within_timelimit(
     n_samples_for_verification: int = 30,
     n_trials: int = 100,
     limit: float = 10,
+    n_jobs: int = 1,
+    n_jobs_per_trial: int = 1,
+    num_workers: int | None = None,
+    journal_file: str | None = None,
+    timeout: float | None = None,
+    patience: int | None = None,
+    cache_file: str | None = None,
+    clear_cache: bool = False,
+    pruner: optuna.pruners.BasePruner | None = None,
+    sampler: str | optuna.samplers.BaseSampler = "tpe",
 ) -> dict:
     """
     Tune CP-SAT hyperparameters to minimize the gap within a given time limit. This is a good
@@ -248,12 +559,29 @@ def tune_for_gap_within_timelimit(
         limit (float): The limit for the gap. Defaults to 10. 10 should be a reasonable value for most cases,
         but if the solver with default parameters is not able to find a solution with that gap within the
         time limit, you should increase it.
+        n_jobs (int): The number of trials to run in parallel. Defaults to 1.
+        n_jobs_per_trial (int): The number of runs of a single trial to execute in parallel. Defaults to 1.
+        num_workers (int | None): Fix the number of workers CP-SAT uses for each solve instead of tuning it.
+                                  Defaults to None, which will tune the number of workers, or, for multiple parallel solves,
+                                  split the available cores among the parallel jobs.
+        journal_file (str | None): Store the Optuna study in this journal file. Defaults to None.
+        timeout (float | None): Stop the tuning after this many seconds. Defaults to None.
+        patience (int | None): Stop the tuning early if the best trial did not change for this many trials
+                               after the initial design. Defaults to None.
+        cache_file (str | None): Persist the scores of all solves in this SQLite file. Defaults to None.
+        clear_cache (bool): Discard the scores stored in the cache file for this model and metric first.
+                            Defaults to False.
+        pruner (optuna.pruners.BasePruner | None): An Optuna pruner to stop bad trials early. Defaults to None.
+        sampler (str | optuna.samplers.BaseSampler): "tpe", "random", or an Optuna sampler. Defaults to "tpe".
     """
     logger.info("Starting tuning for gap within time limit. Limit: %s", limit)
 
     parameter_space = CpSatParameterSpace()
     parameter_space.drop_parameter("max_time_in_seconds")
     parameter_space.filter_applicable_parameters([model])
+    fixed_params = _fix_num_workers(
+        parameter_space, num_workers, n_jobs * n_jobs_per_trial
+    )
     metric = MinGapWithinTimelimit(max_time_in_seconds=max_time_in_seconds, limit=limit)
     return _tune(
         parameter_space,
@@ -262,4 +590,14 @@ def tune_for_gap_within_timelimit(
         n_samples_for_verification,
         n_samples_for_trial,
         n_trials,
+        n_jobs=n_jobs,
+        n_jobs_per_trial=n_jobs_per_trial,
+        fixed_params=fixed_params,
+        journal_file=journal_file,
+        timeout=timeout,
+        patience=patience,
+        cache_file=cache_file,
+        clear_cache=clear_cache,
+        pruner=pruner,
+        sampler=sampler,
     ).params
@@ -0,0 +1,41 @@
+import itertools
+from typing import Callable, Iterable
+
+import pytest
+from ortools.sat.python import cp_model
+from cpsat_autotune.caching_solver import CachingScorer
+from cpsat_autotune.metrics import Metric, MinTimeToOptimal
+
+
+@pytest.fixture
+def model() -> cp_model.CpModel:
+    """
+    A small knapsack model that CP-SAT solves to optimality in a few milliseconds.
+    """
+    model = cp_model.CpModel()
+    x = [model.new_bool_var(f"x{i}") for i in range(10)]
+    model.add(sum((i + 1) * x[i] for i in range(10)) <= 20)
+    model.maximize(sum((i % 3 + 1) * x[i] for i in range(10)))
+    return model
+
+
+@pytest.fixture
+def fake_scorer(model, monkeypatch) -> Callable[..., CachingScorer]:
+    """
+    Returns a factory for scorers whose runs return the given scores in a cycle instead
+    of solving, such that the decisions based on the scores are deterministic.
+    """
+
+    def create(
+        scores: Iterable[float],
+        metric: Metric | None = None,
+        **kwargs,
+    ) -> CachingScorer:
+        scorer = CachingScorer(
+            model, metric if metric is not None else MinTimeToOptimal(1.0), **kwargs
+        )
+        runs = itertools.cycle(scores)
+        monkeypatch.setattr(scorer, "_run", lambda parameters: next(runs))
+        return scorer
+
+    return create
@@ -0,0 +1,12 @@
+import importlib
+import logging
+
+import cpsat_autotune.cli
+
+
+def test_importing_does_not_configure_logging():
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    importlib.reload(cpsat_autotune.cli)
+    assert root.handlers == handlers
+    assert root.level == level
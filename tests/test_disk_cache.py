@@ -0,0 +1,86 @@
+from cpsat_autotune.caching_solver import CachingScorer
+from cpsat_autotune.disk_cache import DiskCache, compute_namespace
+from cpsat_autotune.metrics import MinGapWithinTimelimit, MinTimeToOptimal
+
+
+def test_round_trip(tmp_path):
+    cache = DiskCache(tmp_path / "cache.db", "namespace")
+    key = (("cp_model_presolve", False),)
+    assert cache.get(key) == []
+    cache.append(key, 1.0)
+    cache.append(key, 2.5)
+    assert cache.get(key) == [1.0, 2.5]
+    assert cache.get(()) == []
+    cache.clear()
+    assert cache.get(key) == []
+
+
+def test_namespaces_are_separated(tmp_path):
+    cache_a = DiskCache(tmp_path / "cache.db", "a")
+    cache_b = DiskCache(tmp_path / "cache.db", "b")
+    cache_a.append((), 1.0)
+    cache_b.append((), 2.0)
+    assert cache_a.get(()) == [1.0]
+    assert cache_b.get(()) == [2.0]
+    cache_a.clear()
+    assert cache_a.get(()) == []
+    assert cache_b.get(()) == [2.0]
+
+
+def test_load_new_returns_the_runs_of_other_writers_once(tmp_path):
+    cache_a = DiskCache(tmp_path / "cache.db", "namespace")
+    cache_b = DiskCache(tmp_path / "cache.db", "namespace")
+    cache_a.append((), 1.0)
+    assert cache_a.load_new(()) == []
+    assert cache_b.load_new(()) == [1.0]
+    assert cache_b.load_new(()) == []
+    cache_b.append((), 2.0)
+    cache_a.append((), 3.0)
+    assert cache_a.load_new(()) == [2.0]
+    assert cache_b.load_new(()) == [3.0]
+
+
+def test_compute_namespace(model):
+    namespace = compute_namespace(model, MinTimeToOptimal(1.0), ())
+    assert namespace == compute_namespace(model.clone(), MinTimeToOptimal(1.0), ())
+    assert namespace != compute_namespace(model, MinTimeToOptimal(2.0), ())
+    assert namespace != compute_namespace(
+        model, MinTimeToOptimal(1.0, relative_gap_limit=0.01), ()
+    )
+    assert namespace != compute_namespace(model, MinGapWithinTimelimit(1.0, 10), ())
+    assert namespace != compute_namespace(
+        model, MinTimeToOptimal(1.0), (("num_workers", 1),)
+    )
+
+
+def test_scorer_reloads_scores(model, tmp_path, monkeypatch):
+    cache_file = tmp_path / "cache.db"
+    scorer = CachingScorer(model, MinTimeToOptimal(1.0), cache_file=cache_file)
+    scores = list(scorer.evaluate({}, num_runs=2))
+
+    def fail(parameters):
+        raise AssertionError("The runs should have been loaded from the cache.")
+
+    reloaded = CachingScorer(model, MinTimeToOptimal(1.0), cache_file=cache_file)
+    monkeypatch.setattr(reloaded, "_run", fail)
+    assert list(reloaded.evaluate({}, num_runs=2)) == scores
+    # Other fixed parameters use a different namespace, so nothing is reused.
+    other = CachingScorer(
+        model,
+        MinTimeToOptimal(1.0),
+        fixed_params={"num_workers": 1},
+        cache_file=cache_file,
+    )
+    assert other.num_cached_runs({}) == 0
+    assert len(other.evaluate({}, num_runs=1)) == 1
+
+
+def test_scorer_picks_up_runs_of_parallel_scorers(fake_scorer, tmp_path):
+    cache_file = tmp_path / "cache.db"
+    scorer_a = fake_scorer([1.0], cache_file=cache_file)
+    scorer_b = fake_scorer([2.0], cache_file=cache_file)
+    assert list(scorer_a.evaluate({}, num_runs=1)) == [1.0]
+    assert list(scorer_b.evaluate({}, num_runs=2)) == [1.0, 2.0]
+    assert list(scorer_a.evaluate({}, num_runs=3)) == [1.0, 2.0, 1.0]
+    stored = DiskCache(cache_file, scorer_a._disk_cache.namespace).get(())
+    assert stored == [1.0, 2.0, 1.0]
@@ -0,0 +1,53 @@
+from cpsat_autotune.caching_solver import MultiResult, is_significantly_better
+from cpsat_autotune.metrics import MaxObjective, MinTimeToOptimal
+
+
+def result(*scores: float) -> MultiResult:
+    return MultiResult(scores=list(scores), params={})
+
+
+REFERENCE = result(1.0, 1.1, 0.9, 1.0, 1.05, 0.95)
+
+
+def test_single_run_is_never_knocked_out(fake_scorer):
+    scorer = fake_scorer([])
+    assert not scorer._is_knocked_out(result(100.0), 1.0, REFERENCE)
+
+
+def test_median_knockout(fake_scorer):
+    scorer = fake_scorer([])
+    assert scorer._is_knocked_out(result(5.0, 6.0), 4.0, None)
+    assert scorer._is_knocked_out(result(4.0, 4.0), 4.0, None)
+    # A single bad run does not move the median beyond the knockout score.
+    assert not scorer._is_knocked_out(result(1.0, 6.0, 1.2), 4.0, None)
+
+
+def test_welch_knockout_against_the_reference(fake_scorer):
+    scorer = fake_scorer([])
+    # At least three runs are required for the test.
+    assert not scorer._is_knocked_out(result(3.0, 3.1), None, REFERENCE)
+    assert scorer._is_knocked_out(result(3.0, 3.1, 2.9), None, REFERENCE)
+    assert not scorer._is_knocked_out(result(1.0, 1.1, 0.95), None, REFERENCE)
+
+
+def test_is_significantly_better():
+    metric = MinTimeToOptimal(1.0)
+    better = result(0.5, 0.55, 0.45, 0.5)
+    assert is_significantly_better(metric, better, REFERENCE)
+    assert not is_significantly_better(metric, REFERENCE, better)
+    # A slightly better mean with a lot of noise is not significant.
+    assert not is_significantly_better(metric, result(0.1, 1.8, 0.2, 1.7), REFERENCE)
+
+
+def test_is_significantly_better_without_variation():
+    metric = MinTimeToOptimal(1.0)
+    assert is_significantly_better(metric, result(1.0, 1.0), result(2.0, 2.0))
+    assert not is_significantly_better(metric, result(1.0, 1.0), result(1.0, 1.0))
+
+
+def test_is_significantly_better_when_maximizing():
+    metric = MaxObjective(max_time_in_seconds=1.0, obj_for_timeout=0)
+    higher = result(10.0, 10.5, 9.5, 10.0)
+    lower = result(5.0, 5.5, 4.5, 5.0)
+    assert is_significantly_better(metric, higher, lower)
+    assert not is_significantly_better(metric, lower, higher)
@@ -0,0 +1,52 @@
+import pytest
+from cpsat_autotune.metrics import (
+    Comparison,
+    MaxObjective,
+    MinGapWithinTimelimit,
+    MinObjective,
+    MinTimeToOptimal,
+)
+
+MINIMIZING = [
+    MinTimeToOptimal(1.0),
+    MinObjective(max_time_in_seconds=1.0, obj_for_timeout=100),
+    MinGapWithinTimelimit(1.0, limit=10),
+]
+MAXIMIZING = [MaxObjective(max_time_in_seconds=1.0, obj_for_timeout=0)]
+
+
+@pytest.mark.parametrize("metric", MINIMIZING)
+def test_minimizing_metrics(metric):
+    assert metric.comp(1.0, 2.0) == Comparison.BETTER
+    assert metric.comp(2.0, 1.0) == Comparison.WORSE
+    assert metric.best([3.0, 1.0, 2.0]) == 1.0
+    assert metric.worst([3.0, 1.0, 2.0]) == 3.0
+    assert metric.best([{"score": 3.0}, {"score": 1.0}], key=lambda x: x["score"]) == {
+        "score": 1.0
+    }
+
+
+@pytest.mark.parametrize("metric", MAXIMIZING)
+def test_maximizing_metrics(metric):
+    assert metric.comp(2.0, 1.0) == Comparison.BETTER
+    assert metric.comp(1.0, 2.0) == Comparison.WORSE
+    assert metric.best([3.0, 1.0, 2.0]) == 3.0
+    assert metric.worst([3.0, 1.0, 2.0]) == 1.0
+    assert metric.best([{"score": 3.0}, {"score": 1.0}], key=lambda x: x["score"]) == {
+        "score": 3.0
+    }
+
+
+@pytest.mark.parametrize("metric", MINIMIZING + MAXIMIZING)
+def test_ties(metric):
+    assert metric.comp(1.5, 1.5) == Comparison.EQUAL
+    assert metric.comp(-0.0, 0.0) == Comparison.EQUAL
+    # Among equally good values, the first one is selected.
+    values = [(1.0, "first"), (1.0, "second")]
+    assert metric.best(values, key=lambda x: x[0]) == (1.0, "first")
+    assert metric.worst(values, key=lambda x: x[0]) == (1.0, "first")
+
+
+def test_empty_selection():
+    with pytest.raises(ValueError):
+        MinTimeToOptimal(1.0).best([])
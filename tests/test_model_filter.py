@@ -0,0 +1,48 @@
+from ortools.sat.python import cp_model
+from cpsat_autotune.model_filter import (
+    has_constraint_no_overlap,
+    has_constraint_no_overlap_2d,
+)
+from cpsat_autotune.parameter_space import CpSatParameterSpace
+
+
+def applicable_parameters(model: cp_model.CpModel) -> set[str]:
+    space = CpSatParameterSpace()
+    space.filter_applicable_parameters([model])
+    return set(space.tunable_parameters)
+
+
+def test_modified_models_are_filtered_again():
+    model = cp_model.CpModel()
+    start = model.new_int_var(0, 10, "start")
+    assert "use_strong_propagation_in_disjunctive" not in applicable_parameters(model)
+    model.add_no_overlap([model.new_fixed_size_interval_var(start, 2, "interval")])
+    assert "use_strong_propagation_in_disjunctive" in applicable_parameters(model)
+
+
+def test_empty_no_overlap_constraints_are_ignored():
+    model = cp_model.CpModel()
+    model.new_int_var(0, 10, "start")
+    model.add_no_overlap([])
+    model.add_no_overlap_2d([], [])
+    assert not has_constraint_no_overlap(model)
+    assert not has_constraint_no_overlap_2d(model)
+    parameters = applicable_parameters(model)
+    assert "use_strong_propagation_in_disjunctive" not in parameters
+    assert "use_energetic_reasoning_in_no_overlap_2d" not in parameters
+
+
+def test_non_empty_no_overlap_2d_is_detected():
+    model = cp_model.CpModel()
+    x = model.new_int_var(0, 10, "x")
+    y = model.new_int_var(0, 10, "y")
+    model.add_no_overlap([])
+    model.add_no_overlap_2d(
+        [model.new_fixed_size_interval_var(x, 2, "x_interval")],
+        [model.new_fixed_size_interval_var(y, 2, "y_interval")],
+    )
+    assert not has_constraint_no_overlap(model)
+    assert has_constraint_no_overlap_2d(model)
+    parameters = applicable_parameters(model)
+    assert "use_strong_propagation_in_disjunctive" in parameters
+    assert "use_energetic_reasoning_in_no_overlap_2d" in parameters
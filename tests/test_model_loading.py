@@ -0,0 +1,80 @@
+import pytest
+from ortools.sat.python import cp_model
+from cpsat_autotune import export_model, import_model
+
+
+def build_model() -> cp_model.CpModel:
+    model = cp_model.CpModel()
+    x = [model.new_int_var(0, 10, f"x{i}") for i in range(5)]
+    model.add_all_different(x)
+    model.minimize(sum(x))
+    return model
+
+
+@pytest.mark.parametrize("binary", [True, False])
+@pytest.mark.parametrize("filename", ["model.pb", "model.pbtxt", "model.binpb"])
+def test_the_format_is_detected_from_the_content(tmp_path, filename, binary):
+    model = build_model()
+    export_model(model, tmp_path / filename, binary=binary)
+    assert import_model(tmp_path / filename).Proto() == model.Proto()
+
+
+def test_export_selects_the_format_from_the_suffix(tmp_path):
+    model = build_model()
+    export_model(model, tmp_path / "model.binpb")
+    export_model(model, tmp_path / "model.pbtxt")
+    assert (tmp_path / "model.binpb").read_bytes() == model.Proto().SerializeToString()
+    assert (tmp_path / "model.pbtxt").read_text().startswith("variables")
+
+
+def test_empty_file(tmp_path):
+    (tmp_path / "empty.pb").touch()
+    assert import_model(tmp_path / "empty.pb").Proto() == cp_model.CpModel().Proto()
+
+
+def test_missing_file(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        import_model(tmp_path / "missing.pb")
+
+
+def test_text_models_are_cached_in_the_binary_format(tmp_path):
+    model = build_model()
+    export_model(model, tmp_path / "model.pbtxt")
+    cache_dir = tmp_path / "cache"
+    imported = import_model(tmp_path / "model.pbtxt", cache_dir=cache_dir)
+    assert imported.Proto() == model.Proto()
+    (cache_file,) = cache_dir.iterdir()
+    assert cache_file.read_bytes() == model.Proto().SerializeToString()
+    imported = import_model(tmp_path / "model.pbtxt", cache_dir=cache_dir)
+    assert imported.Proto() == model.Proto()
+
+
+def test_unwritable_cache_is_ignored(tmp_path):
+    model = build_model()
+    export_model(model, tmp_path / "model.pbtxt")
+    # The cache directory cannot be created below a regular file.
+    (tmp_path / "file").touch()
+    cache_dir = tmp_path / "file" / "cache"
+    imported = import_model(tmp_path / "model.pbtxt", cache_dir=cache_dir)
+    assert imported.Proto() == model.Proto()
+
+
+def test_cached_copies_are_specific_to_the_path_and_content(tmp_path):
+    cache_dir = tmp_path / "cache"
+    small, large = cp_model.CpModel(), build_model()
+    small.new_bool_var("x")
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    export_model(small, tmp_path / "a" / "model.pbtxt")
+    export_model(large, tmp_path / "b" / "model.pbtxt")
+    for _ in range(2):
+        imported = import_model(tmp_path / "a" / "model.pbtxt", cache_dir=cache_dir)
+        assert imported.Proto() == small.Proto()
+        imported = import_model(tmp_path / "b" / "model.pbtxt", cache_dir=cache_dir)
+        assert imported.Proto() == large.Proto()
+    assert len(list(cache_dir.iterdir())) == 2
+    # Changing the file replaces its copy instead of adding another one.
+    export_model(large, tmp_path / "a" / "model.pbtxt")
+    imported = import_model(tmp_path / "a" / "model.pbtxt", cache_dir=cache_dir)
+    assert imported.Proto() == large.Proto()
+    assert len(list(cache_dir.iterdir())) == 2
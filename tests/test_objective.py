@@ -0,0 +1,60 @@
+from cpsat_autotune.objective import (
+    MIN_BASELINE_SAMPLES,
+    OptunaCpSatStrategy,
+    evaluate_baseline,
+)
+from cpsat_autotune.parameter_space import CpSatParameterSpace
+
+
+def test_precise_baseline_stops_early(fake_scorer):
+    scorer = fake_scorer([1.0, 1.01, 0.99])
+    assert len(evaluate_baseline(scorer, max_samples=30)) == MIN_BASELINE_SAMPLES
+
+
+def test_noisy_baseline_takes_all_samples(fake_scorer):
+    scorer = fake_scorer([1.0, 10.0])
+    assert len(evaluate_baseline(scorer, max_samples=30)) == 30
+
+
+def test_baseline_without_tolerance_takes_all_samples(fake_scorer):
+    scorer = fake_scorer([1.0])
+    assert len(evaluate_baseline(scorer, max_samples=30, tolerance=None)) == 30
+
+
+def test_baseline_never_exceeds_the_maximal_samples(fake_scorer):
+    scorer = fake_scorer([1.0, 10.0])
+    assert len(evaluate_baseline(scorer, max_samples=5)) == 5
+    scorer = fake_scorer([1.0, 10.0])
+    assert len(evaluate_baseline(scorer, max_samples=12, n_jobs=4)) == 12
+
+
+def test_lucky_single_runs_do_not_become_the_incumbent(fake_scorer):
+    scorer = fake_scorer([2.0] * 5 + [0.1] + [1.0] * 3)
+    strategy = OptunaCpSatStrategy(
+        CpSatParameterSpace(),
+        scorer,
+        n_samples_for_trial=3,
+        n_samples_for_verification=5,
+    )
+    baseline = strategy.get_baseline()
+    assert len(baseline) == 5
+    lucky = scorer.evaluate({"use_erwa_heuristic": True}, num_runs=1)
+    assert strategy._incumbent() is baseline
+    verified = scorer.evaluate({"cp_model_probing_level": 0}, num_runs=3)
+    assert lucky.mean() < verified.mean() < baseline.mean()
+    assert strategy._incumbent() is verified
+    assert strategy.best_params() is verified
+
+
+def test_incumbent_falls_back_to_the_baseline(fake_scorer):
+    scorer = fake_scorer([2.0] * 5 + [0.1])
+    strategy = OptunaCpSatStrategy(
+        CpSatParameterSpace(),
+        scorer,
+        n_samples_for_trial=10,
+        n_samples_for_verification=5,
+    )
+    baseline = strategy.get_baseline()
+    scorer.evaluate({"use_erwa_heuristic": True}, num_runs=1)
+    # No result has enough runs, not even the baseline.
+    assert strategy._incumbent() is baseline
@@ -0,0 +1,79 @@
+from cpsat_autotune.caching_solver import MultiResult
+from cpsat_autotune.parameter_evaluator import (
+    MIN_RUNS_FOR_DECISION,
+    ParameterEvaluator,
+    _compute_contributions,
+)
+
+PARAMS = {"cp_model_presolve": False, "symmetry_level": 0}
+
+
+def result(*scores: float) -> MultiResult:
+    return MultiResult(scores=list(scores), params={})
+
+
+def build_evaluator(scorer) -> ParameterEvaluator:
+    return ParameterEvaluator(
+        params=PARAMS,
+        scorer=scorer,
+        metric=scorer.metric,
+        n_samples_for_verification=20,
+        n_samples_for_trial=10,
+    )
+
+
+def test_is_decided_requires_a_minimum_of_runs(fake_scorer):
+    evaluator = build_evaluator(fake_scorer([]))
+    assert not evaluator._is_decided(result(*[1.0] * (MIN_RUNS_FOR_DECISION - 1)), 5.0)
+    assert evaluator._is_decided(result(*[1.0] * MIN_RUNS_FOR_DECISION), 5.0)
+    assert evaluator._is_decided(result(1.0, 1.1, 0.9), 5.0)
+
+
+def test_is_decided_without_variation(fake_scorer):
+    evaluator = build_evaluator(fake_scorer([]))
+    assert evaluator._is_decided(result(1.0, 1.0, 1.0), 5.0)
+    assert not evaluator._is_decided(result(5.0, 5.0, 5.0), 5.0)
+
+
+def test_is_decided_for_noisy_scores_around_the_threshold(fake_scorer):
+    evaluator = build_evaluator(fake_scorer([]))
+    assert not evaluator._is_decided(result(4.0, 6.0, 4.5, 5.5), 5.0)
+
+
+def test_decided_variants_stop_early(fake_scorer):
+    scorer = fake_scorer([1.0, 1.1, 0.9])
+    evaluator = build_evaluator(scorer)
+    variant = {"symmetry_level": 0}
+    score = evaluator._evaluate_single_parameter(
+        "cp_model_presolve", variant, accept_as_equal=5.0
+    )
+    assert scorer.num_cached_runs(variant) == MIN_RUNS_FOR_DECISION
+    assert score == 1.0
+
+
+def test_undecided_variants_take_all_runs(fake_scorer):
+    scorer = fake_scorer([4.0, 6.0])
+    evaluator = build_evaluator(scorer)
+    variant = {"symmetry_level": 0}
+    score = evaluator._evaluate_single_parameter(
+        "cp_model_presolve", variant, accept_as_equal=5.0
+    )
+    assert scorer.num_cached_runs(variant) == evaluator.n_samples_for_trial
+    assert score == 5.0
+
+
+def test_variants_without_threshold_take_all_runs(fake_scorer):
+    scorer = fake_scorer([1.0])
+    evaluator = build_evaluator(scorer)
+    evaluator._evaluate_single_parameter("cp_model_presolve", {"symmetry_level": 0})
+    assert scorer.num_cached_runs({"symmetry_level": 0}) == evaluator.n_samples_for_trial
+
+
+def test_contributions():
+    contributions = _compute_contributions({"a": 3.0, "b": 1.0})
+    assert contributions == {"a": 0.75, "b": 0.25}
+    assert _compute_contributions({}) == {}
+
+
+def test_contributions_without_any_difference():
+    assert _compute_contributions({"a": 0.0, "b": 0.0}) == {"a": 0.0, "b": 0.0}
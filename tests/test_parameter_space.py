@@ -0,0 +1,71 @@
+import math
+
+import pytest
+from cpsat_autotune.parameter_space import CpSatParameterSpace
+from cpsat_autotune.parameters import (
+    CategoryParameter,
+    IntFromOrderedListParameter,
+    IntParameter,
+)
+
+# The largest value below one, as the points of the unit cube are taken from [0, 1).
+ALMOST_ONE = math.nextafter(1.0, 0.0)
+
+
+def assert_within_bounds(space: CpSatParameterSpace, optuna_params: dict) -> None:
+    """
+    Optuna only warns about integers outside of the distribution of a fixed trial,
+    so the bounds are checked explicitly.
+    """
+    for param in space.tunable_parameters.values():
+        if isinstance(param, IntParameter):
+            value = optuna_params[param.name]
+            assert param.lower_bound <= value <= param.upper_bound, param.name
+        elif isinstance(param, IntFromOrderedListParameter):
+            assert 0 <= optuna_params[param.name] < len(param.values), param.name
+        elif isinstance(param, CategoryParameter):
+            assert optuna_params[param.name] in param.values, param.name
+        else:
+            for name in param.get_optuna_default():
+                assert optuna_params[name] in (True, False), name
+    # Sampling a fixed trial raises for categorical values that are not allowed.
+    space.sample(optuna_params)
+
+
+def test_sample_drops_default_values():
+    space = CpSatParameterSpace()
+    assert space.sample(space.get_default_params_for_optuna()) == {}
+
+
+@pytest.mark.parametrize("u", [0.0, 0.5, ALMOST_ONE])
+def test_unit_cube_maps_into_the_bounds(u):
+    space = CpSatParameterSpace()
+    for param in space.tunable_parameters.values():
+        optuna_params = param.get_optuna_params_from_unit_cube(
+            [u] * param.num_optuna_dimensions()
+        )
+        assert optuna_params.keys() == param.get_optuna_default().keys()
+        assert_within_bounds(
+            space, {**space.get_default_params_for_optuna(), **optuna_params}
+        )
+
+
+def test_sobol_params_are_valid_configurations():
+    space = CpSatParameterSpace()
+    defaults = space.get_default_params_for_optuna()
+    configurations = space.get_sobol_params_for_optuna(20)
+    assert len(configurations) == 20
+    for configuration in configurations:
+        assert configuration.keys() == defaults.keys()
+        assert_within_bounds(space, configuration)
+    # The points cover the space, so the configurations differ from each other.
+    assert len({tuple(sorted(c.items())) for c in configurations}) > 1
+    assert space.get_sobol_params_for_optuna(0) == []
+
+
+def test_sobol_params_respect_dropped_parameters():
+    space = CpSatParameterSpace()
+    space.drop_parameter("num_workers")
+    for configuration in space.get_sobol_params_for_optuna(4):
+        assert "num_workers" not in configuration
+        assert_within_bounds(space, configuration)
@@ -0,0 +1,86 @@
+import optuna
+import pytest
+from cpsat_autotune.parameter_space import CpSatParameterSpace
+from cpsat_autotune.tune import (
+    _NoImprovementStopper,
+    _create_storage,
+    _create_study,
+)
+
+
+def run_study(scores: dict[int, float], patience: int, n_initial_trials: int) -> int:
+    """
+    Runs a study whose trials score 1.0 unless given otherwise by their number, and
+    returns the number of trials executed before the stopper ended it.
+    """
+    study = optuna.create_study(sampler=optuna.samplers.RandomSampler(seed=0))
+    study.optimize(
+        lambda trial: scores.get(trial.number, 1.0),
+        n_trials=100,
+        callbacks=[_NoImprovementStopper(patience, n_initial_trials)],
+    )
+    return len(study.trials)
+
+
+@pytest.mark.parametrize("n_initial_trials", [0, 1, 5])
+def test_stops_after_patience_trials_without_improvement(n_initial_trials):
+    # The first trial stays the best one.
+    assert run_study({0: 0.0}, 3, n_initial_trials) == max(n_initial_trials, 1) + 3
+
+
+def test_improvements_reset_the_patience():
+    assert run_study({0: 0.5, 6: 0.0}, 3, 5) == 10
+    # An improvement within the initial design does not extend it.
+    assert run_study({0: 0.5, 2: 0.0}, 3, 5) == 8
+
+
+def test_the_initial_design_is_completed_before_stopping():
+    space = CpSatParameterSpace()
+    initial_design = (
+        [space.get_default_params_for_optuna()]
+        + space.get_bool_flip_params_for_optuna()[:4]
+        + space.get_sobol_params_for_optuna(4)
+    )
+    study = _create_study(
+        direction="minimize",
+        sampler=optuna.samplers.RandomSampler(seed=0),
+        pruner=optuna.pruners.NopPruner(),
+        storage=None,
+        initial_trials=initial_design,
+    )
+    patience = 3
+    # The default parameters stay the best ones, so nothing after them improves.
+    study.optimize(
+        lambda trial: 0.0 if not space.sample(trial) else 1.0,
+        n_trials=100,
+        callbacks=[_NoImprovementStopper(patience, len(initial_design))],
+    )
+    assert len(study.trials) == len(initial_design) + patience
+    assert study.best_trial.number == 0
+    for trial, params in zip(study.trials, initial_design):
+        assert trial.params == params
+
+
+def create_study_in(journal_file, setup: dict[str, str]) -> optuna.Study:
+    return _create_study(
+        direction="minimize",
+        sampler=optuna.samplers.RandomSampler(seed=0),
+        pruner=optuna.pruners.NopPruner(),
+        storage=_create_storage(str(journal_file)),
+        initial_trials=[{}],
+        setup=setup,
+    )
+
+
+def test_existing_studies_are_only_continued_with_the_same_setup(tmp_path):
+    journal_file = tmp_path / "journal.log"
+    setup = {"metric": "MinTimeToOptimal", "namespace": "abc"}
+    study = create_study_in(journal_file, setup)
+    assert study.user_attrs == {"direction": "minimize", **setup}
+    # Continuing the study does not enqueue the initial trials again.
+    study = create_study_in(journal_file, setup)
+    assert len(study.trials) == 1
+    with pytest.raises(ValueError):
+        create_study_in(journal_file, {**setup, "namespace": "other model"})
+    with pytest.raises(ValueError):
+        create_study_in(journal_file, {**setup, "metric": "MinObjective"})